@@ -0,0 +1,221 @@
+import re
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+
+from app.progress_history import effective_completed, page_subject
+
+PIVOT_DIMENSIONS = ("subject", "year", "status", "milestone")
+STATUS_ORDER = {"Pending": 1, "In Progress": 2, "Completed": 3}
+NO_MILESTONE = "No Milestone"
+# Only what enrich_page and pivot read, to keep aggregation reads small
+PIVOT_PAGE_FIELDS = ("page_link", "subject", "year", "status", "total_questions", "completed_questions")
+
+
+def enrich_page(page: dict) -> dict:
+    """Fill in the derived fields the dashboard shows for a page (in place)"""
+    # Default a missing count to 0, or to all questions for a Completed page
+    page["completed_questions"] = effective_completed(page)
+    
+    # Calculate remaining questions and progress
+    completed = page.get("completed_questions", 0)
+    total = page.get("total_questions", 0)
+    
+    page["remaining_questions"] = max(0, total - completed)
+    page["progress_percentage"] = round(
+        (completed / total) * 100, 2
+    ) if total > 0 else 0
+    
+    # Extract subject from URL only if missing
+    page["subject"] = page_subject(page)
+    
+    # Extract year from URL only if missing or N/A
+    page_link = page.get("page_link", "")
+    if page_link and (not page.get("year") or page.get("year") == "N/A" or page.get("year") == ""):
+        url_str = str(page_link)
+        year_match = re.search(r'(20[1-3][0-9])', url_str)
+        page["year"] = year_match.group(1) if year_match else "N/A"
+    elif not page.get("year"):
+        page["year"] = "N/A"
+    return page
+
+
+def milestone_range(milestone: dict) -> Tuple[int, int]:
+    """(start, end) question of a milestone, whichever fields it was stored with"""
+    start = milestone.get("question_range_start", milestone.get("start_question", 1))
+    end = milestone.get("question_range_end", milestone.get("end_question"))
+    if end is None:
+        # Seed milestones only carry their size
+        end = start + milestone.get("total_questions", 0) - 1
+    return start, end
+
+
+def milestone_title(milestone: dict) -> str:
+    """Display title of a milestone (seed milestones use ``name``)"""
+    return milestone.get("title") or milestone.get("name") or f"Milestone {milestone.get('milestone_number', 1)}"
+
+
+def milestone_labels(pages: List[dict], milestones: List[dict]) -> List[str]:
+    """Milestone title for each page (in order) from the cumulative question range it ends in"""
+    ordered = sorted(milestones, key=lambda m: m.get("start_question", 0))
+    labels = []
+    cumulative = 0
+    index = 0
+    for page in pages:
+        cumulative += page.get("total_questions", 0)
+        # Page ends are increasing, so the matching milestone only moves forward
+        while index < len(ordered) and cumulative > ordered[index].get("end_question", 0):
+            index += 1
+        if index < len(ordered):
+            milestone = ordered[index]
+            labels.append(milestone.get("title") or f"Milestone {milestone.get('milestone_number', index + 1)}")
+        else:
+            labels.append(NO_MILESTONE)
+    return labels
+
+
+def locate_milestones(sorted_milestones: List[dict], completed_questions: int) -> Tuple[Optional[dict], Optional[dict], int]:
+    """Current and previous milestone for a completed count, from milestones sorted by start_question"""
+    current_milestone = None
+    previous_milestone = None
+    current_milestone_index = -1
+    
+    for idx, milestone in enumerate(sorted_milestones):
+        start_q = milestone.get("start_question", 0)
+        end_q = milestone.get("end_question", 0)
+        
+        # If completed questions are within this milestone range, it's current
+        if start_q <= completed_questions < end_q:
+            current_milestone = milestone
+            current_milestone_index = idx
+            # Get previous milestone if exists
+            if idx > 0:
+                previous_milestone = sorted_milestones[idx - 1]
+            break
+        # If completed questions equal or exceed end, this might be the last completed milestone
+        elif completed_questions >= end_q:
+            previous_milestone = milestone
+    
+    # If no current milestone found (all completed or beyond), use the last milestone
+    if not current_milestone and sorted_milestones:
+        current_milestone = sorted_milestones[-1]
+        current_milestone_index = len(sorted_milestones) - 1
+        if len(sorted_milestones) > 1:
+            previous_milestone = sorted_milestones[-2]
+    
+    return current_milestone, previous_milestone, current_milestone_index
+
+
+class PageRanges:
+    """Pages laid end to end as cumulative question ranges (page i covers starts[i]..ends[i]).
+
+    Completed questions are spread evenly over each page's range, and prefix
+    sums make the completed count of any question range a pair of binary
+    searches instead of a scan over every page.
+    """
+    
+    def __init__(self, pages: List[dict]):
+        totals = [page.get("total_questions", 0) for page in pages]
+        self.ends = list(accumulate(totals))
+        self.rates = [
+            page.get("completed_questions", 0) / total if total > 0 else 0
+            for page, total in zip(pages, totals)
+        ]
+        # done[i]: completed questions in all pages before page i
+        self.done = [0.0] + list(accumulate(total * rate for total, rate in zip(totals, self.rates)))
+        self.total = self.ends[-1] if self.ends else 0
+    
+    def completed_through(self, question: int) -> float:
+        """Completed questions in 1..question"""
+        if question <= 0:
+            return 0.0
+        if question >= self.total:
+            return self.done[-1]
+        i = bisect_left(self.ends, question)
+        page_start = self.ends[i - 1] + 1 if i > 0 else 1
+        return self.done[i] + (question - page_start + 1) * self.rates[i]
+    
+    def completed_between(self, start_q: int, end_q: int) -> float:
+        """Completed questions in start_q..end_q"""
+        if end_q < start_q:
+            return 0.0
+        return self.completed_through(end_q) - self.completed_through(start_q - 1)
+
+
+def reflow_ranges(milestones: List[dict], start_question: int = 1) -> Tuple[List[Tuple[dict, int, int]], int]:
+    """Lay milestones (in creation order) end to end from ``start_question``.
+
+    Returns (milestone, start, end) for each milestone whose stored range differs,
+    and the end of the last range.
+    """
+    changed = []
+    for milestone in milestones:
+        end_question = start_question + milestone.get("total_questions", 480) - 1
+        if (milestone.get("start_question"), milestone.get("end_question")) != (start_question, end_question):
+            changed.append((milestone, start_question, end_question))
+        start_question = end_question + 1
+    return changed, start_question - 1
+
+
+def export_milestone_labels(pages: List[dict], sorted_milestones: List[dict]) -> List[str]:
+    """Export label (M1, M2, ... or Beyond) of each page: the first milestone whose end covers the page's end"""
+    # Running max of milestone ends: the first milestone with end >= x is the first
+    # position where the running max reaches x. Page ends only grow, so scan forward.
+    max_ends = list(accumulate((m.get('question_range_end', m.get('end_question', 0)) for m in sorted_milestones), max))
+    labels = []
+    index = 0
+    cumulative = 0
+    for page in pages:
+        cumulative += page.get('total_questions', 0)
+        while index < len(max_ends) and max_ends[index] < cumulative:
+            index += 1
+        if index < len(max_ends):
+            ms_num = sorted_milestones[index].get('milestone_number', 1)
+            labels.append(f"M{ms_num - 1}" if ms_num > 1 else "M1")
+        else:
+            labels.append("Beyond")
+    return labels
+
+
+def pivot(pages: List[dict], milestones: List[dict], group_by: str) -> dict:
+    """Group enriched pages by a dimension and sum their questions"""
+    if group_by not in PIVOT_DIMENSIONS:
+        raise ValueError(f"group_by must be one of: {', '.join(PIVOT_DIMENSIONS)}")
+    
+    if group_by == "milestone":
+        keys = milestone_labels(pages, milestones)
+    else:
+        keys = [str(page.get(group_by) or "Unknown") for page in pages]
+    
+    groups: Dict[str, dict] = {}
+    for key, page in zip(keys, pages):
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                "key": key, "pages": 0, "total_questions": 0, "completed_questions": 0,
+                "remaining_questions": 0, "status_breakdown": {}
+            }
+        total = page.get("total_questions", 0)
+        completed = page.get("completed_questions", 0)
+        status = page.get("status") or "Unknown"
+        group["pages"] += 1
+        group["total_questions"] += total
+        group["completed_questions"] += completed
+        group["remaining_questions"] += total - completed
+        group["status_breakdown"][status] = group["status_breakdown"].get(status, 0) + 1
+    
+    rows = list(groups.values())
+    if group_by == "year":
+        rows.sort(key=lambda r: int(r["key"]) if r["key"].isdigit() else 9999)
+    elif group_by == "status":
+        rows.sort(key=lambda r: STATUS_ORDER.get(r["key"], 5))
+    elif group_by == "milestone":
+        order = {label: i for i, label in enumerate(dict.fromkeys(keys))}
+        rows.sort(key=lambda r: (r["key"] == NO_MILESTONE, order[r["key"]]))
+    else:
+        rows.sort(key=lambda r: r["key"])
+    
+    totals = {name: sum(r[name] for r in rows) for name in ("pages", "total_questions", "completed_questions", "remaining_questions")}
+    for row in rows + [totals]:
+        row["progress_percentage"] = round(row["completed_questions"] / row["total_questions"] * 100, 2) if row["total_questions"] > 0 else 0
+    return {"group_by": group_by, "rows": rows, "totals": totals}
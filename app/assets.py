@@ -0,0 +1,197 @@
+import os
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+from typing import Dict, Tuple
+
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import Receive, Scope, Send
+
+from app.responses import preferred_encodings
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are optional, gzip is always produced
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STATIC_DIR = "static"
+COMPRESSIBLE_EXTENSIONS = {".js", ".css", ".html", ".svg", ".json", ".txt", ".map"}
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+HASHED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{10})(?P<ext>\.[A-Za-z0-9]+)$")
+
+# Third-party libraries, pinned; build_assets.py downloads them into static/vendor
+VENDOR_LIBRARIES = {
+    "chart": ("chart.umd.js", "https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.js"),
+    "countup": ("countUp.min.js", "https://cdn.jsdelivr.net/npm/countup@2.0.7/dist/countUp.min.js"),
+    "confetti": ("confetti.browser.min.js", "https://cdn.jsdelivr.net/npm/canvas-confetti@1.6.0/dist/confetti.browser.min.js"),
+    "xlsx": ("xlsx.full.min.js", "https://cdnjs.cloudflare.com/ajax/libs/xlsx/0.18.5/xlsx.full.min.js"),
+    "jspdf": ("jspdf.umd.min.js", "https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js"),
+}
+
+
+def content_hash(data: bytes) -> str:
+    """Short content hash used in asset URLs"""
+    return hashlib.sha256(data).hexdigest()[:10]
+
+
+def hashed_url(path: str, digest: str) -> str:
+    stem, ext = os.path.splitext(path)
+    return f"/static/{stem}.{digest}{ext}"
+
+
+class AssetManifest:
+    """Content hashes of static files, used to build cache-busting URLs.
+
+    ``url("dashboard.js")`` becomes ``/static/dashboard.<hash>.js``; any change
+    to the file changes the URL, so hashed URLs can be cached forever. Minified
+    output of build_assets.py in ``static/dist`` takes precedence over sources.
+    """
+
+    def __init__(self, directory: str = STATIC_DIR):
+        self.directory = directory
+        self.hashes: Dict[str, str] = {}
+
+    def load(self):
+        """Hash every static file (precompressed variants excluded)"""
+        hashes = {}
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith((".gz", ".br")) or name.startswith("._"):
+                    continue
+                full_path = os.path.join(root, name)
+                with open(full_path, "rb") as f:
+                    digest = content_hash(f.read())
+                hashes[os.path.relpath(full_path, self.directory).replace(os.sep, "/")] = digest
+        self.hashes = hashes
+        logger.info(f"Hashed {len(hashes)} static assets")
+
+    def url(self, path: str) -> str:
+        """Content-hashed URL for a static file, e.g. in templates"""
+        built_path = f"dist/{path}"
+        if built_path in self.hashes:
+            path = built_path
+        digest = self.hashes.get(path)
+        if not digest:
+            return f"/static/{path}"
+        return hashed_url(path, digest)
+
+    def vendor_url(self, name: str) -> str:
+        """Local URL of a vendored library, or its CDN URL if not downloaded yet"""
+        filename, cdn_url = VENDOR_LIBRARIES[name]
+        path = f"vendor/{filename}"
+        return self.url(path) if path in self.hashes else cdn_url
+
+    def resolve(self, path: str) -> Tuple[str, bool]:
+        """Map a requested path to the file on disk and whether it is immutable"""
+        match = HASHED_NAME.match(path)
+        if match:
+            original = match.group("stem") + match.group("ext")
+            if original in self.hashes:
+                # A stale hash still serves the current file, just not as immutable
+                return original, self.hashes[original] == match.group("hash")
+        return path, False
+
+
+class StaticAssets(StaticFiles):
+    """StaticFiles with hashed URLs, immutable caching and precompressed variants"""
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path: str, scope: Scope):
+        original, immutable = self.manifest.resolve(path)
+        response = await self._precompressed_response(original, scope)
+        if response is None:
+            response = await super().get_response(original, scope)
+
+        if response.status_code in (200, 304):
+            response.headers["Cache-Control"] = IMMUTABLE_CACHE if immutable else "no-cache"
+            response.headers.add_vary_header("Accept-Encoding")
+        return response
+
+    async def _precompressed_response(self, path: str, scope: Scope):
+        """Serve a .br/.gz sibling when the client accepts it and it is up to date"""
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if stat_result is None:
+            return None
+
+        suffixes = {"br": ".br", "gzip": ".gz"}
+        for encoding in preferred_encodings(accept_encoding, suffixes):
+            suffix = suffixes[encoding]
+            variant_path, variant_stat = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if variant_stat is None or variant_stat.st_mtime < stat_result.st_mtime:
+                continue
+            response = self.file_response(variant_path, variant_stat, scope)
+            response.headers["Content-Encoding"] = encoding
+            if response.status_code == 200:
+                media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+                if media_type.startswith("text/") or media_type.endswith("javascript"):
+                    media_type += "; charset=utf-8"
+                response.headers["Content-Type"] = media_type
+            return response
+        return None
+
+
+class APIGZipMiddleware(GZipMiddleware):
+    """GZip large API responses; static files are precompressed and event streams must not buffer"""
+
+    def __init__(self, app, exclude_paths: Tuple[str, ...] = (), **kwargs):
+        super().__init__(app, **kwargs)
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/") or path.startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+        # The base class only substring-matches "gzip", so "gzip;q=0" would still be compressed
+        if not preferred_encodings(Headers(scope=scope).get("accept-encoding", ""), ("gzip",)):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+def precompress(directory: str = STATIC_DIR, min_size: int = 1024) -> int:
+    """Write .gz (and .br when Brotli is installed) next to compressible static files"""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            full_path = os.path.join(root, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS or name.startswith("._"):
+                continue
+            if os.path.getsize(full_path) < min_size:
+                continue
+
+            with open(full_path, "rb") as f:
+                data = f.read()
+            variants = {".gz": lambda: gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = lambda: brotli.compress(data, quality=11)
+
+            for suffix, compress in variants.items():
+                target = full_path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(full_path):
+                    continue
+                with open(target, "wb") as f:
+                    f.write(compress())
+                written += 1
+    return written
+
+
+# Global asset manifest
+asset_manifest = AssetManifest()
+
+if __name__ == "__main__":
+    count = precompress()
+    print(f"✅ Wrote {count} precompressed static variants{'' if brotli else ' (gzip only, Brotli not installed)'}")
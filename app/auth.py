@@ -1,5 +1,8 @@
 import os
 import jwt
+import time
+import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from functools import wraps
 from fastapi import HTTPException, status, Depends
@@ -17,6 +20,78 @@ class AdminLoginResponse(BaseModel):
     message: str
     token: Optional[str] = None
 
+logger = logging.getLogger(__name__)
+
+class AuthService:
+    """Admin auth configuration and JWT verification.
+
+    Settings are read from the environment once (at startup, via ``load``) and
+    verified tokens are kept in a small LRU until they expire, so a burst of
+    admin requests with the same token pays for HS256 verification only once.
+    """
+    
+    def __init__(self, cache_size: Optional[int] = None):
+        self.cache_size = cache_size or int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "256"))
+        self.secret_key = None
+        self.admin_email = None
+        self.admin_password = None
+        self.api_key = None
+        self.loaded = False
+        self._verified: "OrderedDict[str, dict]" = OrderedDict()
+    
+    def load(self):
+        """Read auth settings from the environment and drop previously verified tokens"""
+        self.secret_key = os.getenv("JWT_SECRET_KEY", "default_secret_key")
+        self.admin_email = os.getenv("ADMIN_EMAIL")
+        self.admin_password = os.getenv("ADMIN_PASSWORD")
+        self.api_key = os.getenv("ADMIN_API_KEY")
+        self._verified.clear()
+        self.loaded = True
+        logger.info("🔐 Auth configuration loaded")
+    
+    def ensure_loaded(self):
+        # Scripts use the helpers without running the app lifespan
+        if not self.loaded:
+            self.load()
+    
+    def verify_credentials(self, email: str, password: str) -> bool:
+        self.ensure_loaded()
+        if not self.admin_email or not self.admin_password:
+            return False
+        return email == self.admin_email and password == self.admin_password
+    
+    def create_token(self, email: str) -> str:
+        self.ensure_loaded()
+        payload = {
+            "email": email,
+            "exp": datetime.utcnow() + timedelta(hours=24),  # Token expires in 24 hours
+            "iat": datetime.utcnow(),
+            "admin": True
+        }
+        return jwt.encode(payload, self.secret_key, algorithm="HS256")
+    
+    def verify_token(self, token: str) -> dict:
+        """Decode a token, reusing the result of an earlier verification until it expires"""
+        self.ensure_loaded()
+        # Keyed by the whole token: header and payload are covered by the signature,
+        # so only an identical token may reuse a verification
+        payload = self._verified.get(token)
+        if payload is not None:
+            if payload.get("exp", 0) > time.time():
+                self._verified.move_to_end(token)
+                return payload
+            del self._verified[token]
+        
+        payload = jwt.decode(token, self.secret_key, algorithms=["HS256"])
+        if "exp" in payload:
+            self._verified[token] = payload
+            if len(self._verified) > self.cache_size:
+                self._verified.popitem(last=False)
+        return payload
+
+# Global auth service, loaded in the app lifespan
+auth_service = AuthService()
+
 # API Key authentication
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 # JWT Bearer authentication
@@ -34,31 +109,16 @@ async def get_jwt_token(credentials: Optional[HTTPAuthorizationCredentials] = De
 
 async def verify_admin_credentials(email: str, password: str) -> bool:
     """Verify admin email and password"""
-    expected_email = os.getenv("ADMIN_EMAIL")
-    expected_password = os.getenv("ADMIN_PASSWORD")
-    
-    if not expected_email or not expected_password:
-        return False
-    
-    return email == expected_email and password == expected_password
+    return auth_service.verify_credentials(email, password)
 
 def create_admin_token(email: str) -> str:
     """Create JWT token for admin session"""
-    secret_key = os.getenv("JWT_SECRET_KEY", "default_secret_key")
-    payload = {
-        "email": email,
-        "exp": datetime.utcnow() + timedelta(hours=24),  # Token expires in 24 hours
-        "iat": datetime.utcnow(),
-        "admin": True
-    }
-    return jwt.encode(payload, secret_key, algorithm="HS256")
+    return auth_service.create_token(email)
 
 def verify_admin_token(token: str) -> dict:
     """Verify JWT token and return payload"""
     try:
-        secret_key = os.getenv("JWT_SECRET_KEY", "default_secret_key")
-        payload = jwt.decode(token, secret_key, algorithms=["HS256"])
-        return payload
+        return auth_service.verify_token(token)
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -96,7 +156,8 @@ async def verify_admin_access(credentials: HTTPAuthorizationCredentials = Depend
 
 async def verify_admin_api_key(api_key: Optional[str] = Depends(get_api_key)):
     """Verify admin API key for write operations (alternative method)"""
-    expected_key = os.getenv("ADMIN_API_KEY")
+    auth_service.ensure_loaded()
+    expected_key = auth_service.api_key
     
     if not expected_key:
         raise HTTPException(
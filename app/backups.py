@@ -0,0 +1,425 @@
+import os
+import re
+import gzip
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+from bson import ObjectId, json_util
+from bson.json_util import JSONOptions, JSONMode
+
+from app.metrics import backups_reclaimed_bytes
+
+try:
+    import fcntl
+except ImportError:  # Windows - local runs are single process anyway
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = "backups"
+BACKUP_PREFIX = "tracker_backup_"
+BACKUP_COLLECTIONS = ("pages", "milestones")
+BACKUP_FORMAT = "ndjson-v1"
+BACKUP_EXTENSION = ".ndjson.gz"
+STAGING_SUFFIX = "_restore_staging"
+# Live collections are kept under this suffix until every restored collection is in place
+PREVIOUS_SUFFIX = "_restore_previous"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_LOCK_FILE = ".manifest.lock"
+# Extended JSON keeps ObjectIds and datetimes typed, so restores are exact
+EXTENDED_JSON = JSONOptions(json_mode=JSONMode.RELAXED)
+DATE_FIELDS = ("deadline", "start_date")
+# Bookkeeping timestamps; a write that only touches these is not a content change
+HASH_IGNORED_FIELDS = ("created_at", "updated_at")
+READ_CHUNK_SIZE = 64 * 1024
+
+
+_manifest_lock = threading.Lock()
+
+
+@contextmanager
+def manifest_locked(directory: str = BACKUP_DIR):
+    """Hold the manifest for a read-modify-write, across threads and worker processes"""
+    os.makedirs(directory, exist_ok=True)
+    with _manifest_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(directory, MANIFEST_LOCK_FILE), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def content_hash(backup: dict) -> str:
+    """Hash of a canonical serialization of the backed up collections (not the timestamps)"""
+    content = {
+        field: [{key: value for key, value in document.items() if key not in HASH_IGNORED_FIELDS}
+                for document in backup[field]]
+        for field in BACKUP_COLLECTIONS if field in backup
+    }
+    canonical = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def load_manifest(directory: str = BACKUP_DIR) -> List[dict]:
+    """Backup runs, oldest first: one entry per run, pointing at the file holding its content.
+
+    Without a manifest (backups from older versions) the directory is scanned
+    once; those entries have no hash.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)["backups"]
+    except FileNotFoundError:
+        if not os.path.isdir(directory):
+            return []
+        names = sorted(name for name in os.listdir(directory) if name.startswith(BACKUP_PREFIX))
+        return [{"file": name, "hash": None, "created_at": None, "size": None} for name in names]
+
+
+def save_manifest(entries: List[dict], directory: str = BACKUP_DIR):
+    path = os.path.join(directory, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"backups": entries}, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def write_backup(backup: dict, directory: str = BACKUP_DIR) -> Tuple[str, bool]:
+    """Store a backup, content-addressed: if a file with identical content exists only a
+    manifest entry pointing at it is added. Returns (path, whether a new file was written)."""
+    digest = content_hash(backup)
+    with manifest_locked(directory):
+        entries = load_manifest(directory)
+        existing = next(
+            (entry["file"] for entry in reversed(entries)
+             if entry["hash"] == digest and os.path.exists(os.path.join(directory, entry["file"]))),
+            None
+        )
+        filename = existing or f"{BACKUP_PREFIX}{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{digest[:8]}{BACKUP_EXTENSION}"
+        path = os.path.join(directory, filename)
+        if not existing:
+            _write_ndjson(backup, path + ".tmp")
+            os.replace(path + ".tmp", path)
+
+        entries.append({
+            "file": filename,
+            "hash": digest,
+            "created_at": backup.get("backup_timestamp"),
+            "size": os.path.getsize(path)
+        })
+        save_manifest(entries, directory)
+    return path, not existing
+
+
+def _write_ndjson(backup: dict, path: str):
+    """Gzipped newline-delimited extended JSON: a header line, then one line per document"""
+    header = {
+        "format": BACKUP_FORMAT,
+        "backup_timestamp": backup.get("backup_timestamp"),
+        "collections": {name: len(backup[name]) for name in BACKUP_COLLECTIONS if name in backup}
+    }
+    with gzip.open(path, "wt", encoding="utf-8", compresslevel=6) as f:
+        f.write(json.dumps(header) + "\n")
+        for name in header["collections"]:
+            for document in backup[name]:
+                f.write(json_util.dumps({"collection": name, "document": document}, json_options=EXTENDED_JSON) + "\n")
+
+
+def run_time(entry: dict) -> Optional[datetime]:
+    """When a backup run happened (legacy entries: from the file name)"""
+    if entry.get("created_at"):
+        return datetime.fromisoformat(entry["created_at"])
+    match = re.match(rf"{BACKUP_PREFIX}(\d{{8}}_\d{{6}})", entry["file"])
+    return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S") if match else None
+
+
+class RetentionPolicy:
+    """Tiered backup retention: every run from the last ``keep_all_hours``, then the newest
+    run of each hour for ``hourly_days``, then the newest of each day for ``daily_weeks``.
+    The most recent run is always kept, as are runs of unknown age."""
+
+    def __init__(self, keep_all_hours: Optional[float] = None, hourly_days: Optional[float] = None,
+                 daily_weeks: Optional[float] = None):
+        self.keep_all = timedelta(hours=keep_all_hours if keep_all_hours is not None
+                                  else float(os.getenv("BACKUP_KEEP_ALL_HOURS", "24")))
+        self.hourly = timedelta(days=hourly_days if hourly_days is not None
+                                else float(os.getenv("BACKUP_KEEP_HOURLY_DAYS", "7")))
+        self.daily = timedelta(weeks=daily_weeks if daily_weeks is not None
+                               else float(os.getenv("BACKUP_KEEP_DAILY_WEEKS", "4")))
+
+    def keep(self, entries: List[dict], now: datetime) -> List[bool]:
+        """Whether to keep each manifest entry (entries oldest first)"""
+        decisions = []
+        buckets = set()
+        for index, entry in enumerate(reversed(entries)):
+            timestamp = run_time(entry)
+            age = now - timestamp if timestamp else None
+            if index == 0 or age is None or age <= self.keep_all:
+                decisions.append(True)
+                continue
+            if age <= self.hourly:
+                bucket = ("hour", timestamp.strftime("%Y%m%d%H"))
+            elif age <= self.daily:
+                bucket = ("day", timestamp.strftime("%Y%m%d"))
+            else:
+                decisions.append(False)
+                continue
+            # Newest first, so the first run seen in a bucket is the one kept
+            decisions.append(bucket not in buckets)
+            buckets.add(bucket)
+        return decisions[::-1]
+
+
+def prune_backups(policy: Optional[RetentionPolicy] = None, directory: str = BACKUP_DIR,
+                  now: Optional[datetime] = None) -> dict:
+    """Drop manifest entries outside the retention policy and delete files no kept entry uses"""
+    policy = policy or RetentionPolicy()
+    deleted = reclaimed = 0
+    # Deletions happen under the lock too, so no other worker's backup can
+    # start reusing a file between the manifest save and its removal
+    with manifest_locked(directory):
+        entries = load_manifest(directory)
+        decisions = policy.keep(entries, now or datetime.utcnow())
+        kept = [entry for entry, keep in zip(entries, decisions) if keep]
+        if len(kept) < len(entries):
+            save_manifest(kept, directory)
+
+        referenced = {entry["file"] for entry in kept}
+        unreferenced = dict.fromkeys(
+            entry["file"] for entry, keep in zip(entries, decisions) if not keep and entry["file"] not in referenced
+        )
+        for name in unreferenced:
+            path = os.path.join(directory, name)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            deleted += 1
+            reclaimed += size
+    backups_reclaimed_bytes.inc(amount=reclaimed)
+
+    result = {
+        "runs_kept": len(kept),
+        "runs_dropped": len(entries) - len(kept),
+        "files_deleted": deleted,
+        "bytes_reclaimed": reclaimed
+    }
+    if result["runs_dropped"]:
+        logger.info(f"🧹 Pruned {result['runs_dropped']} backup runs, deleted {deleted} files "
+                    f"({reclaimed / 1024 / 1024:.1f} MB reclaimed)")
+    return result
+
+
+def list_backups(directory: str = BACKUP_DIR) -> List[str]:
+    """Distinct backup files, oldest first, from the manifest"""
+    files = dict.fromkeys(entry["file"] for entry in load_manifest(directory))
+    return [os.path.join(directory, name) for name in files]
+
+
+def latest_backup(directory: str = BACKUP_DIR) -> Optional[str]:
+    """File holding the most recent backup run"""
+    entries = load_manifest(directory)
+    return os.path.join(directory, entries[-1]["file"]) if entries else None
+
+
+class _JsonStream:
+    """Reads JSON values from a file one at a time instead of loading it whole"""
+
+    def __init__(self, f, chunk_size: int = READ_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        data = self.f.read(self.chunk_size)
+        if not data:
+            return False
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Malformed backup: expected {char!r}, found {self.peek()!r}")
+        self.pos += 1
+
+    def skip(self, char: str):
+        if self.peek() == char:
+            self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number ending exactly at the buffer end may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_backup_documents(path: str, object_ids: bool = True) -> Iterator[Tuple[str, Optional[dict]]]:
+    """Stream (collection, document) pairs out of a backup file.
+
+    Each restorable collection in the backup is announced with a ``None``
+    document before its documents, so empty collections are seen too. Reads
+    both the NDJSON format and older single-document JSON backups, whose other
+    top-level entries (timestamp, summary) are parsed and skipped. NDJSON
+    documents come back typed; older backups are decoded with restore_document.
+    """
+    if path.endswith(BACKUP_EXTENSION):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            for name in header["collections"]:
+                yield name, None
+            for line in f:
+                entry = json_util.loads(line, json_options=EXTENDED_JSON)
+                yield entry["collection"], entry["document"]
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        stream = _JsonStream(f)
+        stream.expect("{")
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key in BACKUP_COLLECTIONS and stream.peek() == "[":
+                yield key, None
+                stream.expect("[")
+                while stream.peek() != "]":
+                    yield key, restore_document(stream.value(), object_ids)
+                    stream.skip(",")
+                stream.expect("]")
+            else:
+                stream.value()
+            stream.skip(",")
+
+
+def restore_document(document: dict, object_ids: bool = True) -> dict:
+    """Undo the JSON encoding of a backed up document: ObjectId ids and datetimes"""
+    if object_ids and isinstance(document.get("_id"), str) and ObjectId.is_valid(document["_id"]):
+        document["_id"] = ObjectId(document["_id"])
+    for field, value in document.items():
+        if isinstance(value, str) and (field.endswith("_at") or field in DATE_FIELDS):
+            try:
+                document[field] = datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    return document
+
+
+async def restore_collections(database, path: str, batch_size: Optional[int] = None) -> dict:
+    """Restore a backup into MongoDB without loading it into memory.
+
+    Documents are streamed into staging collections in bounded unordered
+    batches. Every staging collection is checked (document count, live indexes
+    rebuilt with their options) before any live collection is touched. Then
+    each live collection is renamed aside and its staging collection renamed
+    into place; if any rename fails, the originals are put back, so pages and
+    milestones are never left from different states. Collections the backup
+    doesn't contain (e.g. milestones in older backups) are left as they are.
+    """
+    batch_size = batch_size or int(os.getenv("RESTORE_BATCH_SIZE", "1000"))
+    started = time.perf_counter()
+    counts = {}
+    batches = {}
+
+    async def flush(name: str):
+        if batches[name]:
+            await database[name + STAGING_SUFFIX].insert_many(batches[name], ordered=False)
+            counts[name] += len(batches[name])
+            batches[name] = []
+
+    existing = set(await database.list_collection_names())
+    interrupted = [name + PREVIOUS_SUFFIX for name in BACKUP_COLLECTIONS if name + PREVIOUS_SUFFIX in existing]
+    if interrupted:
+        # May hold the only copy of live data if an earlier swap died part way
+        raise RuntimeError(f"An earlier restore stopped while swapping collections; check and drop {', '.join(interrupted)} first")
+    for name in BACKUP_COLLECTIONS:
+        # Leftovers of an interrupted restore
+        await database[name + STAGING_SUFFIX].drop()
+
+    for name, document in iter_backup_documents(path):
+        if document is None:
+            counts[name] = 0
+            batches[name] = []
+            await database.create_collection(name + STAGING_SUFFIX)
+            continue
+        batches[name].append(document)
+        if len(batches[name]) >= batch_size:
+            await flush(name)
+    for name in counts:
+        await flush(name)
+
+    for name in counts:
+        staging = database[name + STAGING_SUFFIX]
+        stored = await staging.count_documents({})
+        if stored != counts[name]:
+            raise RuntimeError(f"Staging collection for {name} holds {stored} documents, expected {counts[name]}")
+        if name in existing:
+            # Indexes move with the renamed collection, so copy the live ones (unique, TTL, partial, ...) first
+            for index_name, index in (await database[name].index_information()).items():
+                if index_name != "_id_":
+                    options = {option: value for option, value in index.items() if option not in ("key", "v", "ns")}
+                    await staging.create_index(index["key"], name=index_name, **options)
+
+    swapped = []
+    try:
+        for name in counts:
+            swapped.append(name)
+            if name in existing:
+                await database[name].rename(name + PREVIOUS_SUFFIX)
+            await database[name + STAGING_SUFFIX].rename(name)
+    except Exception:
+        logger.error(f"Restore failed while swapping in {swapped[-1]}, putting back the original collections")
+        present = set(await database.list_collection_names())
+        for name in reversed(swapped):
+            if name + PREVIOUS_SUFFIX in present:
+                await database[name + PREVIOUS_SUFFIX].rename(name, dropTarget=True)
+            elif name not in existing and name in present:
+                await database[name].drop()
+        raise
+    for name in counts:
+        if name in existing:
+            await database[name + PREVIOUS_SUFFIX].drop()
+
+    seconds = time.perf_counter() - started
+    documents = sum(counts.values())
+    size = os.path.getsize(path)
+    result = {
+        "backup": path,
+        "documents": counts,
+        "seconds": round(seconds, 2),
+        "documents_per_second": round(documents / seconds) if seconds else documents,
+        "megabytes_per_second": round(size / 1024 / 1024 / seconds, 2) if seconds else None
+    }
+    logger.info(f"♻️ Restored {documents} documents from {path} in {seconds:.1f}s "
+                f"({result['documents_per_second']} docs/s)")
+    return result
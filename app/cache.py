@@ -0,0 +1,135 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from app.metrics import cache_requests
+
+logger = logging.getLogger(__name__)
+
+DATA_VERSION_ID = "data_version"
+
+
+class DataVersion:
+    """Monotonic data version shared by every worker.
+
+    On MongoDB the version lives in the ``meta`` collection so a write handled by
+    one worker invalidates the caches of all the others. The mock database is
+    per-process, so a local counter is enough there. Changes not yet in the
+    database (write-behind) only bump the local part, which never goes back.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self.local = 0
+        self.collection = None
+        self._poll_task: Optional[asyncio.Task] = None
+
+    async def attach(self, database):
+        """Use the shared version document in the given database"""
+        self.collection = database["meta"]
+        await self.refresh()
+
+    @property
+    def current(self) -> int:
+        # Both parts only grow, so the sum changes whenever either does
+        return self.shared + self.local
+
+    def bump_local(self) -> int:
+        """Invalidate this worker's caches without a database round trip"""
+        self.local += 1
+        return self.current
+
+    async def bump(self) -> int:
+        """Mark data as changed and return the new version"""
+        if self.collection is None:
+            return self.bump_local()
+
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": DATA_VERSION_ID},
+                {"$inc": {"version": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            self.shared = doc["version"]
+        except Exception as e:
+            # Never lose an invalidation because the shared document is unreachable
+            logger.error(f"Error bumping data version: {e}")
+            self.local += 1
+        return self.current
+
+    async def refresh(self) -> int:
+        """Pick up version changes made by other workers"""
+        if self.collection is None:
+            return self.current
+
+        try:
+            doc = await self.collection.find_one({"_id": DATA_VERSION_ID})
+            self.shared = doc["version"] if doc else 0
+        except Exception as e:
+            logger.error(f"Error refreshing data version: {e}")
+        return self.current
+
+    async def _poll(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh()
+
+    def start_polling(self, interval: Optional[float] = None):
+        """Poll the shared version document in the background"""
+        if self.collection is None or self._poll_task:
+            return
+        interval = interval or float(os.getenv("CACHE_VERSION_POLL_SECONDS", "2"))
+        self._poll_task = asyncio.create_task(self._poll(interval))
+
+    async def stop_polling(self):
+        if self._poll_task:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+
+
+class ResponseCache:
+    """In-process cache of computed responses, keyed by data version.
+
+    Entries are dropped as soon as the data version moves on, and after a short
+    TTL so time-dependent fields such as ``days_remaining`` stay fresh.
+    """
+
+    def __init__(self, version: DataVersion, ttl: Optional[float] = None):
+        self.version = version
+        self.ttl = ttl if ttl is not None else float(os.getenv("CACHE_TTL_SECONDS", "60"))
+        self._entries: Dict[str, Tuple[int, float, Any]] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            cache_requests.inc("miss")
+            return None
+
+        version, stored_at, value = entry
+        if version != self.version.current or time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            cache_requests.inc("miss")
+            return None
+        cache_requests.inc("hit")
+        return value
+
+    def set(self, key: str, value: Any, version: int):
+        """Store a value computed from data at ``version`` (read it before querying)"""
+        self._entries[key] = (version, time.monotonic(), value)
+
+    def clear(self):
+        self._entries.clear()
+
+
+# Global cache instances
+data_version = DataVersion()
+response_cache = ResponseCache(data_version)
@@ -0,0 +1,156 @@
+import os
+import time
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional, Set
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.cache import data_version
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ["pages", "milestones"]
+CHECKPOINT_ID = "change_stream"
+
+
+class ChangeWatcher:
+    """Watches pages and milestones for changes made by anyone, including scripts.
+
+    On MongoDB a change stream is used and its resume token is checkpointed to
+    the ``meta`` collection, so a restarted worker picks up where it left off.
+    Standalone servers (no replica set) and the mock database have no change
+    streams, so they fall back to polling a cheap fingerprint of the data.
+    Every detected change bumps the local data version, which invalidates the
+    response cache (including responses still being computed from older
+    data), and is fanned out to live-update subscribers.
+    """
+
+    def __init__(self):
+        self.poll_interval = float(os.getenv("CHANGE_POLL_SECONDS", "5"))
+        self.checkpoint_interval = float(os.getenv("CHANGE_STREAM_CHECKPOINT_SECONDS", "5"))
+        self.mode = "stopped"
+        self._task: Optional[asyncio.Task] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._resume_token = None
+        self._last_checkpoint = 0.0
+
+    def start(self, db_manager):
+        """Start watching in the background"""
+        if self._task:
+            return
+        self._task = asyncio.create_task(self._run(db_manager))
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.mode = "stopped"
+
+    def subscribe(self) -> asyncio.Queue:
+        """Register a live-update listener; events are dropped if it falls behind"""
+        queue = asyncio.Queue(maxsize=100)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    def _publish(self, event: dict):
+        data_version.bump_local()
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                pass
+
+    async def _run(self, db_manager):
+        database = db_manager.shared_database
+        if database is not None:
+            try:
+                await self._watch(database)
+                return
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                # Standalone servers reject $changeStream
+                logger.warning(f"Change streams unavailable ({e}), falling back to polling")
+            except Exception as e:
+                logger.error(f"Change stream failed: {e}, falling back to polling")
+        await self._poll(db_manager)
+
+    async def _watch(self, database):
+        meta = database["meta"]
+        checkpoint = await meta.find_one({"_id": CHECKPOINT_ID})
+        self._resume_token = checkpoint.get("resume_token") if checkpoint else None
+        pipeline = [{"$match": {"ns.coll": {"$in": WATCHED_COLLECTIONS}}}]
+
+        self.mode = "change_stream"
+        logger.info("👀 Watching pages and milestones via change stream")
+        while True:
+            try:
+                async with database.watch(pipeline, resume_after=self._resume_token) as stream:
+                    async for change in stream:
+                        self._publish({
+                            "collection": change["ns"]["coll"],
+                            "operation": change["operationType"],
+                            "document_id": str(change.get("documentKey", {}).get("_id", "")),
+                            "timestamp": datetime.utcnow().isoformat()
+                        })
+                        self._resume_token = stream.resume_token
+                        await self._checkpoint(meta)
+            except asyncio.CancelledError:
+                await self._checkpoint(meta, force=True)
+                raise
+            except OperationFailure as e:
+                if self._resume_token is None:
+                    raise
+                # Token fell off the oplog; start from now and invalidate everything
+                logger.warning(f"Resume token rejected ({e}), restarting change stream")
+                self._resume_token = None
+                self._publish({"collection": "*", "operation": "invalidate", "timestamp": datetime.utcnow().isoformat()})
+            except PyMongoError as e:
+                logger.error(f"Change stream interrupted: {e}, reconnecting")
+                await asyncio.sleep(1)
+
+    async def _checkpoint(self, meta, force: bool = False):
+        """Persist the resume token, at most once per checkpoint interval"""
+        now = time.monotonic()
+        if self._resume_token is None or (not force and now - self._last_checkpoint < self.checkpoint_interval):
+            return
+        try:
+            await meta.update_one(
+                {"_id": CHECKPOINT_ID},
+                {"$set": {"resume_token": self._resume_token, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            self._last_checkpoint = now
+        except Exception as e:
+            logger.error(f"Error saving change stream checkpoint: {e}")
+
+    async def _poll(self, db_manager):
+        self.mode = "polling"
+        logger.info(f"👀 Polling pages and milestones for changes every {self.poll_interval}s")
+        last = await db_manager.get_change_fingerprint()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = await db_manager.get_change_fingerprint()
+            if current is None or current == last:
+                continue
+            for name in WATCHED_COLLECTIONS:
+                if last is None or current.get(name) != last.get(name):
+                    self._publish({
+                        "collection": name,
+                        "operation": "change",
+                        "timestamp": datetime.utcnow().isoformat()
+                    })
+            last = current
+
+
+# Global change watcher instance
+change_watcher = ChangeWatcher()
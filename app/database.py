@@ -1,19 +1,34 @@
 import os
 import json
+import time
+import asyncio
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ServerSelectionTimeoutError
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import ServerSelectionTimeoutError, DuplicateKeyError, OperationFailure, ConfigurationError, BulkWriteError
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from bson import ObjectId
 
 from app.models import PageModel, MilestoneSummary, ReminderResponse, MilestoneModel, MilestoneCreate, MilestoneUpdate, PaymentStatusEnum
+from app.cache import data_version
+from app.timing import db_timing_listener
+from app.metrics import pool_metrics_listener, mongo_pool_max_size, observe_backup
+from app.progress_history import build_progress_event, day_key, since_key, progress_status
+from app.aggregation import PageRanges, locate_milestones, reflow_ranges
+from app.backups import BACKUP_COLLECTIONS, restore_collections, write_backup
+from app.write_behind import write_behind, PartialFlushError
 
 logger = logging.getLogger(__name__)
 
 # Flag to track if we're using mock database
 USE_MOCK_DB = False
 
+# Counters document in ``meta`` handing out milestone numbers and question ranges
+MILESTONE_COUNTER_ID = "milestone_counter"
+# Re-reads allowed when writes keep landing during a fenced backup read
+BACKUP_FENCE_ATTEMPTS = 3
+
 class DatabaseManager:
     def __init__(self):
         self.client: Optional[AsyncIOMotorClient] = None
@@ -45,8 +60,11 @@ class DatabaseManager:
             self.client = AsyncIOMotorClient(
                 mongodb_uri, 
                 serverSelectionTimeoutMS=5000,
-                tlsAllowInvalidCertificates=True  # Disable SSL cert verification for development
+                tlsAllowInvalidCertificates=True,  # Disable SSL cert verification for development
+                # Per-request round trip counts and pool utilization metrics
+                event_listeners=[db_timing_listener, pool_metrics_listener]
             )
+            mongo_pool_max_size.set(self.client.options.pool_options.max_pool_size)
             
             logger.info("🔄 Testing connection with ping...")
             # Test connection with shorter timeout
@@ -60,6 +78,16 @@ class DatabaseManager:
             await self.collection.create_index("page_name")
             await self.collection.create_index("status")
             await self.collection.create_index("created_at")
+            await self.collection.create_index("updated_at")
+            await self.database["milestones"].create_index("updated_at")
+            await self.database["progress_events"].create_index("timestamp")
+            await self.database["progress_events"].create_index("page_id")
+            await self.database["progress_daily"].create_index("updated_at")
+            await self.database["progress_snapshots"].create_index("taken_at")
+            
+            # Share the cache invalidation version with the other workers
+            await data_version.attach(self.database)
+            await self.seed_milestone_counter()
             
         except (ServerSelectionTimeoutError, Exception) as e:
             logger.warning(f"MongoDB connection failed: {e}")
@@ -69,6 +97,17 @@ class DatabaseManager:
             self.mock_db = mock_db_manager
             await self.mock_db.connect_to_mongo()
     
+    @property
+    def shared_database(self):
+        """Mongo database shared by all workers, or None on the mock backend"""
+        return None if USE_MOCK_DB else self.database
+    
+    async def _changed(self, result):
+        """Bump the data version after a successful write and pass the result through"""
+        if result:
+            await data_version.bump()
+        return result
+    
     async def close_mongo_connection(self):
         """Close database connection"""
         if self.client:
@@ -93,12 +132,14 @@ class DatabaseManager:
         """Create a new page record"""
         try:
             if USE_MOCK_DB:
-                return await self.mock_db.create_page(page_data)
+                return await self._changed(await self.mock_db.create_page(page_data))
             
             page_data["created_at"] = datetime.utcnow()
             page_data["updated_at"] = datetime.utcnow()
             
             result = await self.collection.insert_one(page_data)
+            await data_version.bump()
+            await self._record_progress(build_progress_event(result.inserted_id, None, page_data))
             logger.info(f"Created page with ID: {result.inserted_id}")
             return str(result.inserted_id)
         except Exception as e:
@@ -109,75 +150,286 @@ class DatabaseManager:
         """Get a page by its ID"""
         try:
             if USE_MOCK_DB:
-                return await self.mock_db.get_page_by_id(page_id)
-            
-            if not ObjectId.is_valid(page_id):
-                return None
-            
-            page = await self.collection.find_one({"_id": ObjectId(page_id)})
-            if page:
-                page["_id"] = str(page["_id"])
-            return page
+                page = await self.mock_db.get_page_by_id(page_id)
+            else:
+                if not ObjectId.is_valid(page_id):
+                    return None
+                
+                page = await self.collection.find_one({"_id": ObjectId(page_id)})
+                if page:
+                    page["_id"] = str(page["_id"])
+            # Updates still in the write-behind journal
+            return write_behind.overlay([page])[0] if page else None
         except Exception as e:
             logger.error(f"Error getting page by ID {page_id}: {e}")
             return None
     
-    async def get_all_pages(self) -> List[dict]:
-        """Get all pages sorted by created_at ascending (oldest first)"""
+    async def get_all_pages(self, fields: Optional[tuple] = None) -> List[dict]:
+        """Get all pages sorted by created_at ascending (oldest first), optionally only some fields"""
         try:
             if USE_MOCK_DB:
-                return await self.mock_db.get_all_pages()
+                return write_behind.overlay(await self.mock_db.get_all_pages())
             
+            projection = {field: 1 for field in fields} if fields else None
             # Sort by created_at ascending (1) so oldest pages come first
             # This ensures milestone assignment is based on when pages were originally added
-            cursor = self.collection.find({}).sort("created_at", 1)
+            cursor = self.collection.find({}, projection).sort("created_at", 1)
             pages = []
             async for page in cursor:
                 page["_id"] = str(page["_id"])
                 pages.append(page)
-            return pages
+            return write_behind.overlay(pages)
         except Exception as e:
             logger.error(f"Error getting all pages: {e}")
             return []
     
+    async def get_change_fingerprint(self) -> Optional[dict]:
+        """Cheap per-collection (count, last update) fingerprint used to poll for changes"""
+        try:
+            if USE_MOCK_DB:
+                return await self.mock_db.get_change_fingerprint()
+            
+            fingerprint = {}
+            for name in ("pages", "milestones"):
+                collection = self.database[name]
+                count = await collection.count_documents({})
+                latest = await collection.find_one({}, {"updated_at": 1}, sort=[("updated_at", -1)])
+                fingerprint[name] = (count, latest.get("updated_at") if latest else None)
+            return fingerprint
+        except Exception as e:
+            logger.error(f"Error computing change fingerprint: {e}")
+            return None
+    
     async def update_page(self, page_id: str, update_data: dict) -> bool:
         """Update a page"""
         try:
+            if write_behind.active:
+                # Only checks that cost no round trip; an unknown ObjectId is dropped at flush
+                if USE_MOCK_DB and not await self.mock_db.get_page_by_id(page_id):
+                    return False
+                if not USE_MOCK_DB and not ObjectId.is_valid(page_id):
+                    return False
+                # Acknowledged once journaled; flush_page_updates writes it in the background
+                # and bumps the shared data version, so only this worker's caches go now
+                await write_behind.append(page_id, update_data)
+                data_version.bump_local()
+                return True
+            
             if USE_MOCK_DB:
-                return await self.mock_db.update_page(page_id, update_data)
+                return await self._changed(await self.mock_db.update_page(page_id, update_data))
             
             if not ObjectId.is_valid(page_id):
                 return False
             
             update_data["updated_at"] = datetime.utcnow()
             
-            result = await self.collection.update_one(
+            # The pre-update document gives the completion delta in the same round trip
+            previous = await self.collection.find_one_and_update(
                 {"_id": ObjectId(page_id)},
-                {"$set": update_data}
+                {"$set": update_data},
+                return_document=ReturnDocument.BEFORE
             )
             
-            success = result.modified_count > 0
+            success = previous is not None
             if success:
                 logger.info(f"Updated page {page_id}")
-            return success
+                await self._record_progress(build_progress_event(page_id, previous, {**previous, **update_data}))
+            return await self._changed(success)
         except Exception as e:
             logger.error(f"Error updating page {page_id}: {e}")
             return False
     
+    async def update_page_progress(self, page_id: str, completed_questions: int, status: Optional[str] = None) -> Optional[dict]:
+        """Set a page's completed count and derived status in one atomic round trip.
+
+        The ``completed <= total`` check is part of the filter and the status is
+        derived by an update pipeline, so a concurrent size change can't slip in
+        between validation and write. Returns the updated page, or None if the
+        page doesn't exist or the count exceeds its total.
+        """
+        await write_behind.settle(page_id)
+        try:
+            if USE_MOCK_DB:
+                return await self._changed(await self.mock_db.update_page_progress(page_id, completed_questions, status))
+            
+            if not ObjectId.is_valid(page_id):
+                return None
+            
+            now = datetime.utcnow()
+            in_progress_status = "Completed" if status == "Completed" else "In Progress"
+            pipeline = [{"$set": {
+                "completed_questions": completed_questions,
+                "status": {"$switch": {
+                    "branches": [
+                        {"case": {"$eq": ["$total_questions", completed_questions]}, "then": "Completed"},
+                        {"case": {"$literal": completed_questions > 0}, "then": in_progress_status}
+                    ],
+                    "default": status or "$status"
+                }},
+                "updated_at": now
+            }}]
+            
+            # BEFORE rather than AFTER: the progress event needs the old values, and the
+            # new document follows from them by the same rule the pipeline applies
+            previous = await self.collection.find_one_and_update(
+                {"_id": ObjectId(page_id), "total_questions": {"$gte": completed_questions}},
+                pipeline,
+                return_document=ReturnDocument.BEFORE
+            )
+            if previous is None:
+                return None
+            
+            page = {
+                **previous,
+                "_id": page_id,
+                "completed_questions": completed_questions,
+                "status": progress_status(previous.get("total_questions"), completed_questions, status, previous.get("status")),
+                "updated_at": now
+            }
+            logger.info(f"Updated progress of page {page_id}")
+            await self._record_progress(build_progress_event(page_id, previous, page))
+            return await self._changed(page)
+        except Exception as e:
+            logger.error(f"Error updating progress of page {page_id}: {e}")
+            return None
+    
+    async def flush_page_updates(self, entries: list) -> int:
+        """Write journaled page updates (write-behind mode) in journal order with one ordered
+        bulk write; returns how many were applied"""
+        if USE_MOCK_DB:
+            for _, page_id, update, accepted_at in entries:
+                await self.mock_db.update_page(page_id, {**update, "updated_at": accepted_at})
+            return await self._changed(len(entries))
+        
+        page_ids = list({ObjectId(page_id) for _, page_id, _, _ in entries})
+        current = {str(page["_id"]): page async for page in self.collection.find({"_id": {"$in": page_ids}})}
+        error = None
+        try:
+            await self.collection.bulk_write([
+                UpdateOne({"_id": ObjectId(page_id)}, {"$set": {**update, "updated_at": accepted_at}})
+                for _, page_id, update, accepted_at in entries
+            ], ordered=True)
+            applied = len(entries)
+        except BulkWriteError as e:
+            # Ordered: everything before the first error was written, nothing after it
+            applied = e.details["writeErrors"][0]["index"]
+            error = e
+        
+        # Fold each page's updates in order for the progress history
+        for _, page_id, update, accepted_at in entries[:applied]:
+            previous = current.get(page_id)
+            if previous is not None:
+                current[page_id] = {**previous, **update, "updated_at": accepted_at}
+                await self._record_progress(build_progress_event(page_id, previous, current[page_id]))
+        await self._changed(applied)
+        if error is not None:
+            raise PartialFlushError(applied, error)
+        logger.info(f"Flushed {applied} journaled page updates")
+        return applied
+    
+    async def _record_progress(self, event: Optional[dict]):
+        """Append a progress event and fold it into its daily rollup"""
+        if event is None:
+            return
+        try:
+            await self.database["progress_events"].insert_one(event)
+            await self.database["progress_daily"].update_one(
+                {"_id": day_key(event["timestamp"])},
+                {
+                    "$inc": {"completed": event["delta"], "events": 1},
+                    # Server time, not the event's: events can be recorded late (e.g. write-behind flushes)
+                    "$currentDate": {"updated_at": True}
+                },
+                upsert=True
+            )
+        except Exception as e:
+            # History feeds analytics only; never fail the page write because of it
+            logger.error(f"Error recording progress event for page {event['page_id']}: {e}")
+    
+    async def get_daily_progress(self, days: Optional[int] = None, updated_since: Optional[datetime] = None) -> List[dict]:
+        """Daily progress rollups, oldest first, optionally limited to the last ``days`` days
+        or to those changed at or after ``updated_since``"""
+        try:
+            if USE_MOCK_DB:
+                return await self.mock_db.get_daily_progress(days, updated_since)
+            
+            query = {}
+            start = since_key(days)
+            if start:
+                query["_id"] = {"$gte": start}
+            if updated_since:
+                query["updated_at"] = {"$gte": updated_since}
+            cursor = self.database["progress_daily"].find(query).sort("_id", 1)
+            return [rollup async for rollup in cursor]
+        except Exception as e:
+            logger.error(f"Error getting daily progress: {e}")
+            return []
+    
+    async def get_progress_events(self, start: Optional[datetime], end: datetime) -> List[dict]:
+        """Progress events with start < timestamp <= end, oldest first"""
+        try:
+            if USE_MOCK_DB:
+                return await self.mock_db.get_progress_events(start, end)
+            
+            query = {"$lte": end}
+            if start:
+                query["$gt"] = start
+            cursor = self.database["progress_events"].find({"timestamp": query}, {"_id": 0}).sort("timestamp", 1)
+            return [event async for event in cursor]
+        except Exception as e:
+            logger.error(f"Error getting progress events: {e}")
+            raise
+    
+    async def get_history_start(self) -> Optional[datetime]:
+        """When progress history begins: the earliest recorded event or snapshot"""
+        try:
+            if USE_MOCK_DB:
+                return await self.mock_db.get_history_start()
+            
+            event = await self.database["progress_events"].find_one({}, {"timestamp": 1}, sort=[("timestamp", 1)])
+            snapshot = await self.database["progress_snapshots"].find_one({}, {"taken_at": 1}, sort=[("taken_at", 1)])
+            starts = [doc[field] for doc, field in ((event, "timestamp"), (snapshot, "taken_at")) if doc]
+            return min(starts) if starts else None
+        except Exception as e:
+            logger.error(f"Error getting history start: {e}")
+            raise
+    
+    async def save_progress_snapshot(self, snapshot: dict):
+        """Store a summary snapshot"""
+        if USE_MOCK_DB:
+            return await self.mock_db.save_progress_snapshot(snapshot)
+        await self.database["progress_snapshots"].insert_one(snapshot)
+    
+    async def get_nearest_progress_snapshot(self, as_of: datetime, after: bool = False) -> Optional[dict]:
+        """Latest snapshot taken at or before ``as_of``, or the earliest one after it"""
+        try:
+            if USE_MOCK_DB:
+                return await self.mock_db.get_nearest_progress_snapshot(as_of, after)
+            
+            query = {"taken_at": {"$gt": as_of}} if after else {"taken_at": {"$lte": as_of}}
+            return await self.database["progress_snapshots"].find_one(
+                query, {"_id": 0}, sort=[("taken_at", 1 if after else -1)]
+            )
+        except Exception as e:
+            logger.error(f"Error getting progress snapshot: {e}")
+            raise
+    
     async def delete_page(self, page_id: str) -> bool:
         """Delete a page"""
+        await write_behind.settle(page_id)
         try:
             if USE_MOCK_DB:
-                return await self.mock_db.delete_page(page_id)
+                return await self._changed(await self.mock_db.delete_page(page_id))
             
             if not ObjectId.is_valid(page_id):
                 return False
             
-            result = await self.collection.delete_one({"_id": ObjectId(page_id)})
-            success = result.deleted_count > 0
+            deleted = await self.collection.find_one_and_delete({"_id": ObjectId(page_id)})
+            success = deleted is not None
             if success:
                 logger.info(f"Deleted page {page_id}")
-            return success
+                await self._record_progress(build_progress_event(page_id, deleted, None))
+            return await self._changed(success)
         except Exception as e:
             logger.error(f"Error deleting page {page_id}: {e}")
             return False
@@ -203,36 +455,8 @@ class DatabaseManager:
                 completed_questions += page_completed
             
             # Find the current active milestone based on completed questions
-            current_milestone = None
-            previous_milestone = None
-            current_milestone_index = -1
-            
             sorted_milestones = sorted(milestones, key=lambda m: m.get("start_question", 0))
-            
-            for idx, milestone in enumerate(sorted_milestones):
-                start_q = milestone.get("start_question", 0)
-                end_q = milestone.get("end_question", 0)
-                
-                # If completed questions are within this milestone range, it's current
-                if start_q <= completed_questions < end_q:
-                    current_milestone = milestone
-                    current_milestone_index = idx
-                    # Get previous milestone if exists
-                    if idx > 0:
-                        previous_milestone = sorted_milestones[idx - 1]
-                    break
-                # If completed questions equal or exceed end, check if this is the last milestone
-                elif completed_questions >= end_q:
-                    # This might be the last completed milestone, keep checking
-                    previous_milestone = milestone  # Keep track of last completed
-                    continue
-            
-            # If no current milestone found (all completed or beyond), use the last milestone
-            if not current_milestone and milestones:
-                current_milestone = sorted_milestones[-1]
-                current_milestone_index = len(sorted_milestones) - 1
-                if len(sorted_milestones) > 1:
-                    previous_milestone = sorted_milestones[-2]
+            current_milestone, previous_milestone, current_milestone_index = locate_milestones(sorted_milestones, completed_questions)
             
             # If still no milestone, fall back to defaults
             if not current_milestone:
@@ -339,52 +563,125 @@ class DatabaseManager:
     
     async def backup_data(self) -> str:
         """Create a backup of all data"""
+        started = time.perf_counter()
+        backup_path = None
         try:
             if USE_MOCK_DB:
-                return await self.mock_db.backup_data()
+                backup_path = await self.mock_db.backup_data()
+                return backup_path
             
-            pages = await self.get_all_pages()
             backup_data = {
                 "backup_timestamp": datetime.utcnow().isoformat(),
-                "pages": pages,
-                "summary": await self.get_milestone_summary()
+                **await self._read_backup_collections()
             }
             
-            backup_filename = f"tracker_backup_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-            backup_path = os.path.join("backups", backup_filename)
-            
-            # Ensure backups directory exists
-            os.makedirs("backups", exist_ok=True)
-            
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2, default=str)
-            
-            logger.info(f"Backup created: {backup_path}")
+            # Serializing and writing happen off the event loop
+            backup_path, written = await asyncio.to_thread(write_backup, backup_data)
+            if written:
+                logger.info(f"Backup created: {backup_path}")
+            else:
+                logger.info(f"Data unchanged since {backup_path}, recorded in backup manifest")
             return backup_path
         except Exception as e:
             logger.error(f"Error creating backup: {e}")
+            backup_path = None
             raise
+        finally:
+            observe_backup(time.perf_counter() - started, backup_path)
+
+    async def _read_backup_collections(self) -> dict:
+        """Raw pages and milestones as of a single point in time.
+
+        Replica sets (Atlas) read both collections in one snapshot session. A
+        session runs one operation at a time, so there the reads are sequential.
+        Standalone servers have no snapshot reads; they read the collections
+        concurrently and retry while the shared data version moves underneath,
+        failing rather than returning a read that may mix states.
+        """
+        try:
+            async with await self.client.start_session(snapshot=True) as session:
+                return {
+                    name: await self.database[name].find({}, session=session).to_list(None)
+                    for name in BACKUP_COLLECTIONS
+                }
+        except (OperationFailure, ConfigurationError) as e:
+            logger.info(f"Snapshot reads unavailable ({e}), fencing the backup read with the data version")
+        
+        for attempt in range(BACKUP_FENCE_ATTEMPTS):
+            version = await data_version.refresh()
+            documents = await asyncio.gather(*(
+                self.database[name].find({}).to_list(None) for name in BACKUP_COLLECTIONS
+            ))
+            if await data_version.refresh() == version:
+                break
+            logger.warning(f"Data changed during backup read (attempt {attempt + 1}), reading again")
+        else:
+            # Never write a backup that may mix states; the next run tries again
+            raise RuntimeError(f"Data kept changing during {BACKUP_FENCE_ATTEMPTS} backup reads; no consistent copy")
+        return dict(zip(BACKUP_COLLECTIONS, documents))
+    
+    async def restore_backup(self, backup_path: str) -> dict:
+        """Replace pages and milestones with the contents of a backup file"""
+        if USE_MOCK_DB:
+            result = await self.mock_db.restore_backup(backup_path)
+        else:
+            result = await restore_collections(self.database, backup_path)
+            await self.seed_milestone_counter(force=True)
+        await data_version.bump()
+        return result
 
     # Milestone Management Methods
+    async def seed_milestone_counter(self, force: bool = False):
+        """Initialise the milestone counter from existing milestones (``force`` resets it to match them)"""
+        if USE_MOCK_DB:
+            return self.mock_db.seed_milestone_counter()
+        
+        highest = await self.database["milestones"].aggregate([
+            {"$group": {
+                "_id": None,
+                "milestone_number": {"$max": "$milestone_number"},
+                "end_question": {"$max": "$end_question"}
+            }}
+        ]).to_list(1)
+        values = {
+            "milestone_number": (highest[0]["milestone_number"] or 0) if highest else 0,
+            "end_question": (highest[0]["end_question"] or 0) if highest else 0
+        }
+        try:
+            await self.database["meta"].update_one(
+                {"_id": MILESTONE_COUNTER_ID},
+                {"$set" if force else "$setOnInsert": values},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # Another worker seeded it at the same time
+    
+    async def allocate_milestone(self, total_questions: int) -> Tuple[int, int, int]:
+        """Atomically reserve the next milestone number and question range: (number, start, end)"""
+        if USE_MOCK_DB:
+            return self.mock_db.allocate_milestone(total_questions)
+        
+        counter = await self.database["meta"].find_one_and_update(
+            {"_id": MILESTONE_COUNTER_ID},
+            {"$inc": {"milestone_number": 1, "end_question": total_questions}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        end_question = counter["end_question"]
+        return counter["milestone_number"], end_question - total_questions + 1, end_question
+    
     async def create_milestone(self, milestone_data: dict) -> str:
-        """Create a new milestone"""
+        """Create a new milestone (number and range come from allocate_milestone)"""
         try:
             if USE_MOCK_DB:
-                return await self.mock_db.create_milestone(milestone_data)
+                return await self._changed(await self.mock_db.create_milestone(milestone_data))
             
             milestones_collection = self.database["milestones"]
-            
-            # Get the next milestone number
-            latest_milestone = await milestones_collection.find_one(
-                {}, sort=[("milestone_number", -1)]
-            )
-            next_number = (latest_milestone["milestone_number"] + 1) if latest_milestone else 1
-            
-            milestone_data["milestone_number"] = next_number
             milestone_data["created_at"] = datetime.utcnow()
             milestone_data["updated_at"] = datetime.utcnow()
             
             result = await milestones_collection.insert_one(milestone_data)
+            await data_version.bump()
             logger.info(f"Created milestone with ID: {result.inserted_id}")
             return str(result.inserted_id)
         except Exception as e:
@@ -404,22 +701,9 @@ class DatabaseManager:
             # Get all pages for progress calculation
             all_pages = await self.get_all_pages()
             
-            # Calculate cumulative questions from all pages in order
+            # Lay pages end to end as cumulative question ranges, in creation order
             pages_sorted = sorted(all_pages, key=lambda x: x.get("created_at", datetime.min))
-            cumulative_questions = 0
-            page_question_mapping = []
-            
-            for page in pages_sorted:
-                page_total = page.get("total_questions", 0)
-                page_completed = page.get("completed_questions", 0)
-                page_question_mapping.append({
-                    "page_id": page.get("_id"),
-                    "start": cumulative_questions + 1,
-                    "end": cumulative_questions + page_total,
-                    "total": page_total,
-                    "completed": page_completed
-                })
-                cumulative_questions += page_total
+            page_ranges = PageRanges(pages_sorted)
             
             async for milestone in cursor:
                 milestone["_id"] = str(milestone["_id"])
@@ -428,26 +712,12 @@ class DatabaseManager:
                 start_q = milestone.get("start_question", 1)
                 end_q = milestone.get("end_question", 480)
                 
-                # Calculate progress based on pages that fall within this milestone's range
-                milestone_completed = 0
+                # Calculate progress based on the page questions that fall within this milestone's range
+                milestone_completed = page_ranges.completed_between(start_q, end_q)
                 milestone_total = end_q - start_q + 1
                 
-                for page_map in page_question_mapping:
-                    # Check if page overlaps with milestone range
-                    if page_map["end"] >= start_q and page_map["start"] <= end_q:
-                        # Calculate how many questions from this page belong to this milestone
-                        overlap_start = max(page_map["start"], start_q)
-                        overlap_end = min(page_map["end"], end_q)
-                        overlap_total = overlap_end - overlap_start + 1
-                        
-                        # Calculate completed questions in this overlap
-                        page_completion_rate = page_map["completed"] / page_map["total"] if page_map["total"] > 0 else 0
-                        overlap_completed = overlap_total * page_completion_rate
-                        
-                        milestone_completed += overlap_completed
-                
-                # Add progress fields
-                milestone["completed_questions"] = int(milestone_completed)
+                # Add progress fields (the epsilon absorbs float noise from the prefix sums)
+                milestone["completed_questions"] = int(milestone_completed + 1e-9)
                 milestone["total_questions"] = milestone_total
                 milestone["progress_percentage"] = round((milestone_completed / milestone_total * 100) if milestone_total > 0 else 0, 2)
                 milestone["question_range_start"] = start_q
@@ -483,7 +753,7 @@ class DatabaseManager:
         """Update a milestone"""
         try:
             if USE_MOCK_DB:
-                return await self.mock_db.update_milestone(milestone_id, update_data)
+                return await self._changed(await self.mock_db.update_milestone(milestone_id, update_data))
             
             if not ObjectId.is_valid(milestone_id):
                 return False
@@ -499,11 +769,63 @@ class DatabaseManager:
             success = result.modified_count > 0
             if success:
                 logger.info(f"Updated milestone {milestone_id}")
-            return success
+            return await self._changed(success)
         except Exception as e:
             logger.error(f"Error updating milestone {milestone_id}: {e}")
             return False
 
+    async def reflow_milestone_ranges(self, from_milestone_id: Optional[str] = None) -> Optional[int]:
+        """Recompute cumulative question ranges from a milestone onwards (all milestones by default)
+        and write the changed ones in one bulk write. Returns how many ranges changed, or None if
+        the milestone doesn't exist."""
+        try:
+            if USE_MOCK_DB:
+                return await self._changed(await self.mock_db.reflow_milestone_ranges(from_milestone_id))
+            
+            milestones_collection = self.database["milestones"]
+            query, start_question, anchor = {}, 1, None
+            if from_milestone_id:
+                if not ObjectId.is_valid(from_milestone_id):
+                    return None
+                anchor = await milestones_collection.find_one(
+                    {"_id": ObjectId(from_milestone_id)}, {"created_at": 1, "start_question": 1}
+                )
+                if anchor is None:
+                    return None
+                if anchor.get("start_question") is None:
+                    anchor = None  # Never laid out, so lay out everything
+                else:
+                    # Earlier milestones keep their ranges; only the suffix is read and rewritten
+                    query = {"created_at": {"$gte": anchor["created_at"]}}
+                    start_question = anchor["start_question"]
+            
+            fields = {"created_at": 1, "total_questions": 1, "start_question": 1, "end_question": 1}
+            milestones = await milestones_collection.find(query, fields).sort([("created_at", 1), ("_id", 1)]).to_list(None)
+            if anchor is not None:
+                milestones = milestones[[m["_id"] for m in milestones].index(anchor["_id"]):]
+            
+            changed, end_question = reflow_ranges(milestones, start_question)
+            if changed:
+                now = datetime.utcnow()
+                await milestones_collection.bulk_write([
+                    UpdateOne({"_id": milestone["_id"]}, {"$set": {
+                        "start_question": start,
+                        "end_question": end,
+                        "question_range": f"{start}-{end}",
+                        "updated_at": now
+                    }})
+                    for milestone, start, end in changed
+                ], ordered=False)
+                # The next milestone starts after the new last range
+                await self.database["meta"].update_one(
+                    {"_id": MILESTONE_COUNTER_ID}, {"$set": {"end_question": end_question}}
+                )
+                logger.info(f"Re-flowed question ranges of {len(changed)} milestones")
+            return await self._changed(len(changed))
+        except Exception as e:
+            logger.error(f"Error re-flowing milestone ranges: {e}")
+            raise
+
     async def update_payment_status(self, milestone_id: str, payment_status: PaymentStatusEnum) -> bool:
         """Update the payment status of a milestone"""
         try:
@@ -516,22 +838,37 @@ class DatabaseManager:
         """Delete a milestone by its ID"""
         try:
             if USE_MOCK_DB:
-                return await self.mock_db.delete_milestone(milestone_id)
+                return await self._changed(await self.mock_db.delete_milestone(milestone_id))
             
             if not ObjectId.is_valid(milestone_id):
                 return False
             
             milestones_collection = self.database["milestones"]
-            result = await milestones_collection.delete_one({"_id": ObjectId(milestone_id)})
+            deleted = await milestones_collection.find_one_and_delete({"_id": ObjectId(milestone_id)})
             
-            success = result.deleted_count > 0
+            success = deleted is not None
             if success:
                 logger.info(f"Deleted milestone {milestone_id}")
-            return success
+                await self._release_milestone(deleted)
+            return await self._changed(success)
         except Exception as e:
             logger.error(f"Error deleting milestone {milestone_id}: {e}")
             return False
 
+    async def _release_milestone(self, milestone: dict):
+        """Hand a deleted milestone's number and range back if nothing was allocated after it"""
+        if "end_question" not in milestone or "start_question" not in milestone:
+            return
+        size = milestone["end_question"] - milestone["start_question"] + 1
+        await self.database["meta"].update_one(
+            {
+                "_id": MILESTONE_COUNTER_ID,
+                "milestone_number": milestone.get("milestone_number"),
+                "end_question": milestone["end_question"]
+            },
+            {"$inc": {"milestone_number": -1, "end_question": -size}}
+        )
+    
     async def get_current_milestone(self) -> Optional[dict]:
         """Get the current active milestone"""
         try:
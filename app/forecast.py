@@ -0,0 +1,152 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, date, timedelta
+from typing import Dict, List, Optional
+
+from app.aggregation import milestone_range, milestone_title
+from app.progress_history import day_gain
+
+logger = logging.getLogger(__name__)
+
+WINDOWS = (7, 14, 30)
+
+
+def _parse_day(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str) and value:
+        try:
+            return datetime.strptime(value.split("T")[0], "%Y-%m-%d").date()
+        except ValueError:
+            return None
+    return None
+
+
+class VelocityForecaster:
+    """Completion velocity and ETAs from the daily progress rollups.
+
+    State is kept between requests: each sync only fetches rollups updated since
+    the previous one, and the exponentially weighted rate folds in each finished
+    day exactly once. Rollup ``updated_at`` is the database's write time, and each
+    sync re-reads a short overlap before the last one seen, so a write that
+    committed just after a sync with a slightly earlier time is still picked up. Only a late change to an already folded day forces the
+    weighted rate to be recomputed from the (compact) daily series.
+    """
+
+    def __init__(self, alpha: Optional[float] = None):
+        self.alpha = alpha if alpha is not None else float(os.getenv("FORECAST_EWMA_ALPHA", "0.3"))
+        self.sync_overlap = timedelta(seconds=float(os.getenv("FORECAST_SYNC_OVERLAP_SECONDS", "5")))
+        self.daily: Dict[str, int] = {}
+        self.synced_at: Optional[datetime] = None
+        self._ewma: Optional[float] = None
+        self._ewma_through: Optional[date] = None
+        self._lock = asyncio.Lock()
+
+    def reset(self):
+        self.daily = {}
+        self.synced_at = None
+        self._ewma = None
+        self._ewma_through = None
+
+    async def sync(self, db_manager):
+        """Apply rollups changed since the last sync"""
+        async with self._lock:
+            since = self.synced_at - self.sync_overlap if self.synced_at else None
+            rollups = await db_manager.get_daily_progress(updated_since=since)
+            self.apply(rollups)
+
+    def apply(self, rollups: List[dict]):
+        for rollup in rollups:
+            key = rollup["_id"]
+            # A day with a net loss (reset, deletion) counts as no progress
+            completed = day_gain(rollup)
+            if self._ewma_through and _parse_day(key) <= self._ewma_through and self.daily.get(key) != completed:
+                # A day already folded into the weighted rate changed; refold from the start
+                self._ewma = None
+                self._ewma_through = None
+            self.daily[key] = completed
+            updated_at = rollup.get("updated_at")
+            if updated_at and (self.synced_at is None or updated_at > self.synced_at):
+                self.synced_at = updated_at
+
+    def _first_day(self) -> Optional[date]:
+        return _parse_day(min(self.daily)) if self.daily else None
+
+    def _fold(self, today: date):
+        """Fold every finished day (before today) into the weighted rate"""
+        first_day = self._first_day()
+        if first_day is None:
+            return
+        day = self._ewma_through + timedelta(days=1) if self._ewma_through else first_day
+        while day < today:
+            completed = self.daily.get(day.isoformat(), 0)
+            self._ewma = completed if self._ewma is None else self.alpha * completed + (1 - self.alpha) * self._ewma
+            self._ewma_through = day
+            day += timedelta(days=1)
+
+    def ewma_rate(self, today: date) -> Optional[float]:
+        """Weighted daily rate over finished days; today's partial count is only used without any"""
+        self._fold(today)
+        if self._ewma is not None:
+            return self._ewma
+        if self.daily:
+            return float(self.daily.get(today.isoformat(), 0))
+        return None
+
+    def window(self, days: int, today: date) -> dict:
+        """Completions and daily rate over the trailing window, including today"""
+        first_day = self._first_day()
+        if first_day is None:
+            return {"completed": 0, "days": 0, "daily_rate": 0}
+        covered = max(1, min(days, (today - first_day).days + 1))
+        completed = sum(self.daily.get((today - timedelta(days=offset)).isoformat(), 0) for offset in range(covered))
+        return {"completed": completed, "days": covered, "daily_rate": round(completed / covered, 2)}
+
+    def forecast(self, overall_completed: int, milestones: List[dict], now: Optional[datetime] = None) -> dict:
+        """Velocity windows plus an ETA for every milestone not finished yet"""
+        now = now or datetime.utcnow()
+        today = now.date()
+        windows = {f"{days}d": self.window(days, today) for days in WINDOWS}
+        ewma = self.ewma_rate(today)
+        rate = ewma if ewma else windows[f"{WINDOWS[-1]}d"]["daily_rate"]
+
+        etas = []
+        for milestone in sorted(milestones, key=lambda m: milestone_range(m)[0]):
+            end_question = milestone_range(milestone)[1]
+            remaining = max(0, end_question - overall_completed)
+            deadline = _parse_day(milestone.get("deadline"))
+            if remaining == 0:
+                eta, days_needed = today, 0
+            elif rate > 0:
+                days_needed = remaining / rate
+                eta = (now + timedelta(days=days_needed)).date()
+            else:
+                eta, days_needed = None, None
+
+            etas.append({
+                "milestone_id": milestone.get("_id"),
+                "milestone_number": milestone.get("milestone_number"),
+                "title": milestone_title(milestone),
+                "end_question": end_question,
+                "remaining_questions": remaining,
+                "days_needed": round(days_needed, 1) if days_needed is not None else None,
+                "estimated_completion_date": eta.isoformat() if eta else None,
+                "deadline": deadline.isoformat() if deadline else None,
+                "on_track": (eta <= deadline) if eta and deadline else None
+            })
+
+        return {
+            "generated_at": now.isoformat(),
+            "history_days": (today - self._first_day()).days + 1 if self.daily else 0,
+            "windows": windows,
+            "ewma_daily_rate": round(ewma, 2) if ewma is not None else None,
+            "ewma_alpha": self.alpha,
+            "forecast_daily_rate": round(rate, 2),
+            "overall_completed": overall_completed,
+            "milestones": etas
+        }
+
+
+# Global forecaster instance
+forecaster = VelocityForecaster()
@@ -0,0 +1,236 @@
+import os
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import idempotent_requests
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+MAX_KEY_LENGTH = 255
+MUTATING_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+# Response headers worth replaying; CORS and timing headers are added fresh by outer middleware
+REPLAYED_HEADERS = ("content-type", "location")
+
+# A stored outcome: (request fingerprint, status, headers, body); status is None while in flight
+Record = Tuple[str, Optional[int], list, bytes]
+
+
+class IdempotencyStore:
+    """Remembers the response to each Idempotency-Key for a while.
+
+    On MongoDB records live in the ``idempotency_keys`` collection, expired by a
+    TTL index, so a retry is recognized whichever worker it lands on. The mock
+    database is per-process, so a bounded in-memory LRU is enough there.
+    """
+
+    def __init__(self):
+        self.ttl = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+        # A reservation older than this belongs to a request that died mid-flight
+        self.lock_seconds = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+        self.max_entries = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "1000"))
+        self.collection = None
+        self._entries: "OrderedDict[str, Tuple[float, Record]]" = OrderedDict()
+
+    async def attach(self, database):
+        """Keep records in a shared TTL collection instead of process memory"""
+        collection = database["idempotency_keys"]
+        try:
+            await collection.create_index("created_at", expireAfterSeconds=self.ttl)
+        except OperationFailure:
+            # Index exists with a different TTL; adjust it in place
+            await database.command("collMod", "idempotency_keys",
+                                   index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": self.ttl})
+        self.collection = collection
+
+    async def reserve(self, key: str, fingerprint: str) -> Optional[Record]:
+        """Claim a key for a new request, or return the record already held under it"""
+        if self.collection is None:
+            return self._reserve_local(key, fingerprint)
+
+        now = datetime.utcnow()
+        try:
+            await self.collection.insert_one({"_id": key, "fingerprint": fingerprint, "status": None, "created_at": now})
+            return None
+        except DuplicateKeyError:
+            pass
+
+        doc = await self.collection.find_one({"_id": key})
+        if doc is None:  # Expired in between; try once more
+            return await self.reserve(key, fingerprint)
+        if doc["status"] is None and doc["created_at"] < now - timedelta(seconds=self.lock_seconds):
+            taken = await self.collection.find_one_and_update(
+                {"_id": key, "status": None, "created_at": doc["created_at"]},
+                {"$set": {"fingerprint": fingerprint, "created_at": now}}
+            )
+            if taken is not None:
+                return None
+            doc = await self.collection.find_one({"_id": key}) or doc
+        return doc["fingerprint"], doc["status"], doc.get("headers", []), doc.get("body", b"")
+
+    def _reserve_local(self, key: str, fingerprint: str) -> Optional[Record]:
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, record = entry
+            expired = now - stored_at > self.ttl
+            abandoned = record[1] is None and now - stored_at > self.lock_seconds
+            if not expired and not abandoned:
+                self._entries.move_to_end(key)
+                return record
+        self._entries[key] = (now, (fingerprint, None, [], b""))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return None
+
+    async def complete(self, key: str, fingerprint: str, status: int, headers: list, body: bytes):
+        """Store the response for replay"""
+        if self.collection is None:
+            self._entries[key] = (time.monotonic(), (fingerprint, status, headers, body))
+            return
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {"status": status, "headers": headers, "body": body, "created_at": datetime.utcnow()}}
+        )
+
+    async def release(self, key: str):
+        """Forget a reservation so the request can be retried"""
+        if self.collection is None:
+            self._entries.pop(key, None)
+            return
+        await self.collection.delete_one({"_id": key, "status": None})
+
+
+def _scoped_key(key: str, scope: Scope, headers: Headers) -> str:
+    """Keys are per endpoint and per credential, so one caller can't replay another's response"""
+    parts = [key, scope["method"], scope["path"], headers.get("authorization", "")]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class IdempotencyMiddleware:
+    """Replays the stored response when a mutating API request is retried with the same Idempotency-Key.
+
+    Only completed responses below 500 are stored; server errors release the key so
+    the retry runs again. A retry while the first attempt is still running gets 409,
+    and reusing a key for a different request body gets 422.
+    """
+
+    def __init__(self, app: ASGIApp, store: "IdempotencyStore", exclude_paths: Tuple[str, ...] = ()):
+        self.app = app
+        self.store = store
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if (scope["type"] != "http" or scope["method"] not in MUTATING_METHODS
+                or not scope["path"].startswith("/api/") or scope["path"].startswith(self.exclude_paths)):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await JSONResponse({"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"}, 400)(scope, receive, send)
+            return
+
+        # Buffer the request body to fingerprint it, then hand it on unchanged
+        messages = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request" or not message.get("more_body", False):
+                break
+        body_hash = hashlib.sha256(b"".join(m.get("body", b"") for m in messages))
+        body_hash.update(scope.get("query_string", b""))
+        fingerprint = body_hash.hexdigest()
+        record_key = _scoped_key(key, scope, headers)
+
+        try:
+            existing = await self.store.reserve(record_key, fingerprint)
+        except Exception as e:
+            # Never fail a write because the key store is unreachable
+            logger.error(f"Idempotency store unavailable, processing request without it: {e}")
+            existing, record_key = None, None
+
+        if existing is not None:
+            stored_fingerprint, status, stored_headers, stored_body = existing
+            if stored_fingerprint != fingerprint:
+                idempotent_requests.inc("mismatch")
+                response = JSONResponse({"detail": "Idempotency-Key was already used for a different request"}, 422)
+            elif status is None:
+                idempotent_requests.inc("in_progress")
+                response = JSONResponse({"detail": "A request with this Idempotency-Key is still being processed"}, 409,
+                                        headers={"Retry-After": "1"})
+            else:
+                idempotent_requests.inc("replayed")
+                await send({"type": "http.response.start", "status": status,
+                            "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored_headers]
+                            + [(b"idempotent-replayed", b"true")]})
+                await send({"type": "http.response.body", "body": stored_body})
+                return
+            await response(scope, receive, send)
+            return
+
+        pending = list(messages)
+
+        async def replay_receive() -> Message:
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        started: Dict = {}
+        chunks = []
+        settled = record_key is None
+
+        async def settle(status: Optional[int], response_headers: list, body: bytes):
+            nonlocal settled
+            if settled:
+                return
+            settled = True
+            try:
+                if status is not None and status < 500:
+                    await self.store.complete(record_key, fingerprint, status, response_headers, body)
+                    idempotent_requests.inc("stored")
+                else:
+                    await self.store.release(record_key)
+            except Exception as e:
+                logger.error(f"Error saving idempotent response: {e}")
+
+        async def send_and_record(message: Message):
+            if message["type"] == "http.response.start":
+                started["status"] = message["status"]
+                started["headers"] = [
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", [])
+                    if name.decode("latin-1").lower() in REPLAYED_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    # Record before background tasks (e.g. backups) run, so a retry doesn't wait on them
+                    await settle(started.get("status"), started.get("headers", []), b"".join(chunks))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_and_record)
+        except BaseException:
+            await asyncio.shield(settle(None, [], b""))
+            raise
+        await settle(None, [], b"")
+
+
+# Global idempotency key store
+idempotency_store = IdempotencyStore()
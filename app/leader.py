@@ -0,0 +1,106 @@
+import os
+import socket
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+try:
+    import fcntl
+except ImportError:  # Windows - local runs are single process anyway
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """Elects a single process to run scheduled jobs.
+
+    With MongoDB a lease document in the ``locks`` collection is taken and
+    renewed; if the leader dies the lease expires and another worker takes over.
+    Without MongoDB an exclusive file lock is used, which the OS releases when
+    the holding process exits.
+    """
+
+    def __init__(self, name: str = "scheduler"):
+        self.name = name
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.lease_seconds = int(os.getenv("LEADER_LEASE_SECONDS", "90"))
+        self.collection = None
+        self.is_leader = False
+        self._lock_file = None
+
+    def attach(self, database):
+        """Use a Mongo lease instead of a local file lock"""
+        self.collection = database["locks"]
+
+    async def acquire(self) -> bool:
+        """Take or renew leadership; safe to call repeatedly"""
+        if self.collection is not None:
+            self.is_leader = await self._acquire_mongo()
+        else:
+            self.is_leader = self._acquire_file()
+        return self.is_leader
+
+    async def _acquire_mongo(self) -> bool:
+        now = datetime.utcnow()
+        try:
+            await self.collection.find_one_and_update(
+                {
+                    "_id": self.name,
+                    "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]
+                },
+                {"$set": {
+                    "owner": self.owner,
+                    "expires_at": now + timedelta(seconds=self.lease_seconds),
+                    "renewed_at": now
+                }},
+                upsert=True
+            )
+            if not self.is_leader:
+                logger.info(f"👑 Acquired '{self.name}' leadership as {self.owner}")
+            return True
+        except DuplicateKeyError:
+            # Another live process holds the lease
+            return False
+        except Exception as e:
+            logger.error(f"Error acquiring '{self.name}' lease: {e}")
+            return False
+
+    def _acquire_file(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        if fcntl is None:
+            return True
+
+        os.makedirs("backups", exist_ok=True)
+        lock_file = open(os.path.join("backups", f".{self.name}.lock"), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        lock_file.write(self.owner)
+        lock_file.flush()
+        self._lock_file = lock_file
+        logger.info(f"👑 Acquired '{self.name}' file lock as {self.owner}")
+        return True
+
+    async def release(self):
+        """Give up leadership so another worker can take over immediately"""
+        if self.collection is not None and self.is_leader:
+            try:
+                await self.collection.delete_one({"_id": self.name, "owner": self.owner})
+            except Exception as e:
+                logger.error(f"Error releasing '{self.name}' lease: {e}")
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+        self.is_leader = False
+
+
+# Global scheduler leader lock
+leader_lock = LeaderLock()
@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from typing import Optional
+
+from app.metrics import loop_lag, loop_lag_last, slow_callbacks, slow_callback_duration
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoopMonitor:
+    """Finds code that blocks the event loop (enable with LOOP_MONITOR=1).
+
+    A heartbeat task on the loop records when it last ran and how late it woke
+    up (loop lag). A watchdog thread notices when the heartbeat is overdue by
+    more than the threshold and grabs the loop thread's stack at that moment,
+    i.e. the stack of the code that is blocking. When the loop recovers the
+    stall is logged with its duration and that stack, and counted in /metrics.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("LOOP_MONITOR", "").lower() in ("1", "true", "yes")
+        self.interval = float(os.getenv("LOOP_MONITOR_INTERVAL_SECONDS", "0.05"))
+        self.threshold = float(os.getenv("LOOP_MONITOR_THRESHOLD_MS", "100")) / 1000
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._beat = 0
+        self._captured = None  # (beat, location, stack) of the current stall
+
+    def start(self):
+        if self._task:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+        logger.info(f"🩺 Event loop monitor on (stalls over {self.threshold * 1000:.0f} ms are reported)")
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _heartbeat(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._last_beat = time.monotonic()
+            self._beat += 1
+            loop_lag.observe(lag)
+            loop_lag_last.set(lag)
+
+            captured, self._captured = self._captured, None
+            if captured and lag >= self.threshold:
+                _, location, stack = captured
+                slow_callbacks.inc(location)
+                slow_callback_duration.observe(lag)
+                logger.warning(f"🐢 Event loop blocked for {lag * 1000:.0f} ms in {location}\n{stack}")
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            beat = self._beat
+            if time.monotonic() - self._last_beat < self.threshold:
+                continue
+            if self._captured and self._captured[0] == beat:
+                continue  # Already have the stack of this stall
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._captured = (beat, self._location(frame), "".join(traceback.format_stack(frame, limit=15)))
+
+    @staticmethod
+    def _location(frame) -> str:
+        """Innermost frame in project code (falls back to the innermost frame)"""
+        innermost = frame
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(PROJECT_ROOT) and "site-packages" not in filename:
+                return f"{os.path.relpath(filename, PROJECT_ROOT)}:{frame.f_code.co_name}"
+            frame = frame.f_back
+        return f"{os.path.basename(innermost.f_code.co_filename)}:{innermost.f_code.co_name}"
+
+
+# Global loop monitor instance
+loop_monitor = LoopMonitor()
@@ -1,22 +1,40 @@
 import os
+import json
+import asyncio
 import logging
 import re
 import csv
 import io
 from datetime import datetime
+from typing import Optional
 from fastapi import FastAPI, HTTPException, Depends, Request, BackgroundTasks
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 from dotenv import load_dotenv
 
 from app.database import db_manager
+from app.cache import data_version, response_cache
+from app.leader import leader_lock
+from app.change_stream import change_watcher
+from app.responses import ORJSONResponse, API_GZIP_LEVEL, cache_body, cached_body_response
+from app.assets import asset_manifest, StaticAssets, APIGZipMiddleware
+from app.timing import TimingMiddleware, TimedRoute
+from app.metrics import registry, CONTENT_TYPE as METRICS_CONTENT_TYPE, loop_lag_sampler, timed_job
+from app.loop_monitor import loop_monitor
+from app.progress_history import daily_rate_from_rollups
+from app.forecast import forecaster
+from app.aggregation import PIVOT_DIMENSIONS, PIVOT_PAGE_FIELDS, enrich_page, export_milestone_labels, pivot
+from app.snapshots import SNAPSHOT_INTERVAL_HOURS, take_snapshot, progress_as_of, parse_as_of
+from app.backups import prune_backups
+from app.write_behind import write_behind
+from app.idempotency import idempotency_store, IdempotencyMiddleware
 from app.models import PageModel, PageCreate, PageUpdate, MilestoneSummary, ReminderResponse, StatusEnum, MilestoneModel, MilestoneCreate, MilestoneUpdate, PaymentStatusEnum
-from app.auth import verify_admin_access, AdminLogin, AdminLoginResponse, verify_admin_credentials, create_admin_token
+from app.auth import auth_service, verify_admin_access, AdminLogin, AdminLoginResponse, verify_admin_credentials, create_admin_token
 
 # Load environment variables
 load_dotenv()
@@ -39,20 +57,88 @@ async def automated_backup():
     except Exception as e:
         logger.error(f"Automated backup failed: {e}")
 
+async def scheduled_backup():
+    """Nightly backup, run only by the scheduler leader when several workers are up"""
+    if not await leader_lock.acquire():
+        logger.info("Skipping scheduled backup - another worker holds scheduler leadership")
+        return
+    await automated_backup()
+
+async def scheduled_snapshot():
+    """Periodic progress snapshot for historical views (leader only)"""
+    if not await leader_lock.acquire():
+        return
+    try:
+        await take_snapshot(db_manager)
+    except Exception as e:
+        logger.error(f"Progress snapshot failed: {e}")
+
+async def scheduled_backup_prune():
+    """Apply the backup retention policy (leader only)"""
+    if not await leader_lock.acquire():
+        return
+    try:
+        await asyncio.to_thread(prune_backups)
+    except Exception as e:
+        logger.error(f"Backup pruning failed: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     try:
         await db_manager.connect_to_mongo()
+        # Optional: acknowledge page updates once journaled locally, flush them in the background
+        if write_behind.enabled:
+            write_behind.start(db_manager.flush_page_updates)
+        auth_service.load()
+        asset_manifest.load()
+        
+        # Coordinate with other workers/replicas through the shared database
+        shared_database = db_manager.shared_database
+        if shared_database is not None:
+            leader_lock.attach(shared_database)
+            await idempotency_store.attach(shared_database)
+            data_version.start_polling()
+        await leader_lock.acquire()
+        
+        # Pick up changes made outside the API (fix/restore scripts)
+        change_watcher.start(db_manager)
+        # Loop lag: the monitor samples finely and reports blocking code; otherwise a cheap 1s sampler
+        if loop_monitor.enabled:
+            loop_monitor.start()
+        else:
+            loop_lag_sampler.start()
         
-        # Schedule daily backups at 2 AM
+        # Schedule daily backups at 2 AM (leader only)
         scheduler.add_job(
-            automated_backup,
+            timed_job("daily_backup", scheduled_backup),
             CronTrigger(hour=2, minute=0),
             id="daily_backup",
             replace_existing=True
         )
+        # Compact progress snapshots for /api/progress?as_of= (first one right away)
+        scheduler.add_job(
+            timed_job("progress_snapshot", scheduled_snapshot),
+            IntervalTrigger(hours=SNAPSHOT_INTERVAL_HOURS),
+            id="progress_snapshot",
+            next_run_time=datetime.now(),
+            replace_existing=True
+        )
+        # Thin out old backups so backup storage stays bounded
+        scheduler.add_job(
+            timed_job("backup_prune", scheduled_backup_prune),
+            IntervalTrigger(hours=float(os.getenv("BACKUP_PRUNE_INTERVAL_HOURS", "1"))),
+            id="backup_prune",
+            replace_existing=True
+        )
+        # Keep the leader lease alive, or take it over if the leader died
+        scheduler.add_job(
+            timed_job("leader_lease", leader_lock.acquire),
+            IntervalTrigger(seconds=max(5, leader_lock.lease_seconds // 3)),
+            id="leader_lease",
+            replace_existing=True
+        )
         scheduler.start()
         logger.info("Application started successfully")
         
@@ -65,6 +151,12 @@ async def lifespan(app: FastAPI):
     # Shutdown
     try:
         scheduler.shutdown()
+        await change_watcher.stop()
+        await loop_lag_sampler.stop()
+        await loop_monitor.stop()
+        await data_version.stop_polling()
+        await leader_lock.release()
+        await write_behind.stop()
         await db_manager.close_mongo_connection()
         logger.info("Application shutdown completed")
     except Exception as e:
@@ -75,8 +167,15 @@ app = FastAPI(
     title="IITian Academy Milestone Tracker",
     description="Professional milestone and question tracker for Freelancer.com projects",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
+# Time response building from the moment each endpoint returns (see app.timing)
+app.router.route_class = TimedRoute
+
+# Replay stored responses for retried writes (innermost, so replays still get CORS headers)
+# Login is excluded so tokens are never persisted
+app.add_middleware(IdempotencyMiddleware, store=idempotency_store, exclude_paths=("/api/auth/",))
 
 # CORS middleware
 app.add_middleware(
@@ -87,9 +186,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON API responses (static assets are served precompressed)
+# Cached endpoints send their own precompressed bodies, which pass through untouched
+app.add_middleware(APIGZipMiddleware, minimum_size=1024, compresslevel=API_GZIP_LEVEL, exclude_paths=("/api/events",))
+
+# Server-Timing headers and a structured log line per request (outermost, so it times everything)
+app.add_middleware(TimingMiddleware)
+
 # Static files and templates
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", StaticAssets(directory="static", manifest=asset_manifest), name="static")
 templates = Jinja2Templates(directory="templates")
+templates.env.globals["asset_url"] = asset_manifest.url
+templates.env.globals["vendor_url"] = asset_manifest.vendor_url
+
+async def cached_response(key: str, content, version: int, request: Request) -> ORJSONResponse:
+    """Serialize and gzip content once and cache the bytes so later hits skip encoding and compression.
+
+    ``version`` is the data version read before querying, so a write landing
+    while the response is built leaves the entry already stale.
+    """
+    cached = await cache_body(content)
+    response_cache.set(key, cached, version)
+    return cached_body_response(cached, request)
 
 # Root endpoint - Dashboard
 @app.get("/", response_class=HTMLResponse)
@@ -143,7 +261,7 @@ async def admin_login(login_data: AdminLogin):
 async def get_admin_api_key():
     """Get the admin API key for authenticated sessions"""
     return {
-        "api_key": os.getenv("ADMIN_API_KEY")
+        "api_key": auth_service.api_key
     }
 
 # API Endpoints
@@ -183,40 +301,26 @@ async def update_page(
 ):
     """Update page progress (Admin only)"""
     try:
-        # Get current page to validate
-        current_page = await db_manager.get_page_by_id(page_id)
-        if not current_page:
-            raise HTTPException(status_code=404, detail="Page not found")
-        
-        # Validate completed questions doesn't exceed total
-        if update_data.completed_questions > current_page.get("total_questions", 0):
+        # Validation, status derivation and write happen atomically in the database
+        status = update_data.status.value if update_data.status else None
+        updated_page = await db_manager.update_page_progress(page_id, update_data.completed_questions, status)
+        
+        if updated_page is None:
+            # Only failed updates pay for a second lookup to tell the two cases apart
+            if not await db_manager.get_page_by_id(page_id):
+                raise HTTPException(status_code=404, detail="Page not found")
             raise HTTPException(
                 status_code=400, 
                 detail="Completed questions cannot exceed total questions"
             )
         
-        # Auto-update status based on progress
-        update_dict = update_data.dict(exclude_unset=True)
-        
-        if update_data.completed_questions == current_page.get("total_questions", 0):
-            update_dict["status"] = StatusEnum.COMPLETED
-        elif update_data.completed_questions > 0:
-            if update_dict.get("status") != StatusEnum.COMPLETED:
-                update_dict["status"] = StatusEnum.IN_PROGRESS
-        
-        success = await db_manager.update_page(page_id, update_dict)
+        # Trigger backup after update
+        background_tasks.add_task(automated_backup)
         
-        if success:
-            # Trigger backup after update
-            background_tasks.add_task(automated_backup)
-            
-            updated_page = await db_manager.get_page_by_id(page_id)
-            return {
-                "message": "Page updated successfully",
-                "data": updated_page
-            }
-        else:
-            raise HTTPException(status_code=404, detail="Page not found or not updated")
+        return {
+            "message": "Page updated successfully",
+            "data": updated_page
+        }
             
     except HTTPException:
         raise
@@ -225,26 +329,112 @@ async def update_page(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/progress")
-async def get_progress():
-    """Get milestone summary (Public)"""
+async def get_progress(request: Request, as_of: Optional[str] = None):
+    """Get milestone summary, or historical progress counters with ?as_of=YYYY-MM-DD[THH:MM] (Public)"""
     try:
+        if as_of:
+            try:
+                as_of_time = parse_as_of(as_of)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="as_of must be an ISO date or datetime")
+            # Not cached: arbitrary as_of values would grow the cache without bound
+            return ORJSONResponse(await progress_as_of(db_manager, as_of_time))
+        
+        cached = response_cache.get("progress")
+        if cached is not None:
+            return cached_body_response(cached, request)
+        
+        version = data_version.current
         summary = await db_manager.get_milestone_summary()
-        return summary
+        if not summary:
+            # Empty means the summary could not be computed; don't keep serving that
+            return summary
+        return await cached_response("progress", summary, version, request)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting progress: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/public/milestones")
-async def get_public_milestones():
+async def get_public_milestones(request: Request):
     """Get all milestones for public view (No authentication required)"""
     try:
+        cached = response_cache.get("public_milestones")
+        if cached is not None:
+            return cached_body_response(cached, request)
+        
+        version = data_version.current
         milestones = await db_manager.get_all_milestones()
         # Return in same format as other endpoints for consistency
-        return {"milestones": milestones}
+        return await cached_response("public_milestones", {"milestones": milestones}, version, request)
     except Exception as e:
         logger.error(f"Error getting public milestones: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/forecast")
+async def get_forecast(request: Request):
+    """Completion velocity windows and per-milestone ETAs (Public)"""
+    try:
+        cached = response_cache.get("forecast")
+        if cached is not None:
+            return cached_body_response(cached, request)
+        
+        version = data_version.current
+        await forecaster.sync(db_manager)
+        summary = await db_manager.get_milestone_summary()
+        milestones = await db_manager.get_all_milestones()
+        overall_completed = summary.get("overall_completed", summary.get("completed_questions", 0))
+        forecast = forecaster.forecast(overall_completed, milestones)
+        if not summary:
+            return forecast
+        return await cached_response("forecast", forecast, version, request)
+    except Exception as e:
+        logger.error(f"Error calculating forecast: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/pivot")
+async def get_pivot(request: Request, group_by: str = "year"):
+    """Pages grouped by subject, year, status or milestone with summed questions (Public)"""
+    if group_by not in PIVOT_DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of: {', '.join(PIVOT_DIMENSIONS)}")
+    try:
+        key = f"pivot:{group_by}"
+        cached = response_cache.get(key)
+        if cached is not None:
+            return cached_body_response(cached, request)
+        
+        version = data_version.current
+        pages = await db_manager.get_all_pages(fields=PIVOT_PAGE_FIELDS)
+        milestones = await db_manager.get_all_milestones() if group_by == "milestone" else []
+        return await cached_response(key, pivot([enrich_page(page) for page in pages], milestones, group_by), version, request)
+    except Exception as e:
+        logger.error(f"Error building pivot by {group_by}: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """Live data-change events as Server-Sent Events (Public)"""
+    queue = change_watcher.subscribe()
+    
+    async def event_stream():
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                    yield f"event: change\ndata: {json.dumps(event)}\n\n"
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+        finally:
+            change_watcher.unsubscribe(queue)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/page/{page_id}")
 async def get_page(page_id: str):
     """Get individual page details (Public)"""
@@ -267,63 +457,21 @@ async def get_page(page_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/pages")
-async def get_all_pages():
+async def get_all_pages(request: Request):
     """Get all pages (Public)"""
     try:
+        cached = response_cache.get("pages")
+        if cached is not None:
+            return cached_body_response(cached, request)
+        
+        version = data_version.current
         pages = await db_manager.get_all_pages()
         
         # Calculate dynamic fields for each page and add subject/year extraction
         for page in pages:
-            # Ensure completed_questions field exists (default to 0 if missing)
-            if "completed_questions" not in page:
-                page["completed_questions"] = 0
-            
-            # Auto-set completed_questions based on status if missing
-            if page.get("status") == "Completed" and page.get("completed_questions", 0) == 0:
-                page["completed_questions"] = page.get("total_questions", 0)
-            
-            # Calculate remaining questions and progress
-            completed = page.get("completed_questions", 0)
-            total = page.get("total_questions", 0)
-            
-            page["remaining_questions"] = max(0, total - completed)
-            page["progress_percentage"] = round(
-                (completed / total) * 100, 2
-            ) if total > 0 else 0
-            
-            # Extract subject from URL only if missing
-            page_link = page.get("page_link", "")
-            if page_link and (not page.get("subject") or page.get("subject") == "General"):
-                url_str = str(page_link)
-                subject_patterns = {
-                    r'chemistry': 'Chemistry',
-                    r'physics': 'Physics',
-                    r'maths?': 'Maths',
-                    r'mathematics?': 'Maths',
-                    r'ap_stats?': 'AP Stats',
-                    r'statistics?': 'Statistics',
-                    r'biology': 'Biology',
-                    r'english': 'English'
-                }
-                
-                subject = "General"
-                for pattern, subj in subject_patterns.items():
-                    if re.search(pattern, url_str, re.IGNORECASE):
-                        subject = subj
-                        break
-                page["subject"] = subject
-            elif not page.get("subject"):
-                page["subject"] = "General"
-            
-            # Extract year from URL only if missing or N/A
-            if page_link and (not page.get("year") or page.get("year") == "N/A" or page.get("year") == ""):
-                url_str = str(page_link)
-                year_match = re.search(r'(20[1-3][0-9])', url_str)
-                page["year"] = year_match.group(1) if year_match else "N/A"
-            elif not page.get("year"):
-                page["year"] = "N/A"
-        
-        return {"pages": pages}
+            enrich_page(page)
+        
+        return await cached_response("pages", {"pages": pages}, version, request)
     except Exception as e:
         logger.error(f"Error getting all pages: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -455,9 +603,14 @@ async def delete_page(
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/reminder")
-async def get_reminder():
+async def get_reminder(request: Request):
     """Calculate progress reminder and performance analysis (Public)"""
     try:
+        cached = response_cache.get("reminder")
+        if cached is not None:
+            return cached_body_response(cached, request)
+        
+        version = data_version.current
         summary = await db_manager.get_milestone_summary()
         
         if not summary:
@@ -468,13 +621,14 @@ async def get_reminder():
         days_remaining = summary.get("days_remaining", 0)
         completed_questions = summary.get("completed_questions", 0)
         
-        # Calculate days since project started
-        created_date = datetime.strptime(os.getenv("MILESTONE_CREATED", "2025-10-13"), "%Y-%m-%d")
-        days_elapsed = (datetime.now() - created_date).days
-        days_elapsed = max(1, days_elapsed)  # Avoid division by zero
-        
-        # Calculate average daily completion rate
-        average_daily_rate = completed_questions / days_elapsed
+        # Average daily completion rate from the recorded progress history
+        average_daily_rate = daily_rate_from_rollups(await db_manager.get_daily_progress())
+        if average_daily_rate is None:
+            # No history yet; assume steady progress since the project started
+            created_date = datetime.strptime(os.getenv("MILESTONE_CREATED", "2025-10-13"), "%Y-%m-%d")
+            days_elapsed = (datetime.now() - created_date).days
+            days_elapsed = max(1, days_elapsed)  # Avoid division by zero
+            average_daily_rate = completed_questions / days_elapsed
         
         # Estimate completion date
         days_needed = 0
@@ -500,7 +654,7 @@ async def get_reminder():
             performance_trend = "Behind Schedule"
             recommendation = "Significant increase in daily output required"
         
-        return {
+        reminder = {
             "remaining_questions": remaining_questions,
             "average_daily_rate": round(average_daily_rate, 2),
             "estimated_completion_date": estimated_completion_date,
@@ -510,6 +664,7 @@ async def get_reminder():
             "required_daily_rate": round(required_daily_rate, 2),
             "days_remaining": days_remaining
         }
+        return await cached_response("reminder", reminder, version, request)
         
     except Exception as e:
         logger.error(f"Error calculating reminder: {e}")
@@ -562,25 +717,15 @@ async def create_milestone(
     try:
         milestone_dict = milestone_data.model_dump()
         
-        # Get all existing milestones to calculate the next range
-        existing_milestones = await db_manager.get_all_milestones()
-        
-        # Find the highest end_question from existing milestones
-        if existing_milestones:
-            max_end_question = max([m.get("end_question", 0) for m in existing_milestones])
-            start_question = max_end_question + 1
-        else:
-            start_question = 1
-        
-        # Calculate end question based on total_questions
+        # Number and range come from an atomic counter, so concurrent admins never overlap
         total_questions = milestone_dict.get("total_questions", 480)
-        end_question = start_question + total_questions - 1
+        milestone_number, start_question, end_question = await db_manager.allocate_milestone(total_questions)
         
         # Add calculated fields
         milestone_dict["start_question"] = start_question
         milestone_dict["end_question"] = end_question
         milestone_dict["question_range"] = f"{start_question}-{end_question}"
-        milestone_dict["milestone_number"] = len(existing_milestones) + 1
+        milestone_dict["milestone_number"] = milestone_number
         
         milestone_id = await db_manager.create_milestone(milestone_dict)
         
@@ -601,7 +746,8 @@ async def get_all_milestones(admin_verified: bool = Depends(verify_admin_access)
     """Get all milestones (Admin only)"""
     try:
         milestones = await db_manager.get_all_milestones()
-        return milestones
+        # Plain documents: skip jsonable_encoder, orjson handles them directly
+        return ORJSONResponse(milestones)
     except Exception as e:
         logger.error(f"Error getting milestones: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -637,16 +783,43 @@ async def update_milestone(
         if not success:
             raise HTTPException(status_code=404, detail="Milestone not found or no changes made")
         
+        # A new size moves this milestone's end and every later range
+        reflowed = 0
+        if "total_questions" in update_dict:
+            reflowed = await db_manager.reflow_milestone_ranges(milestone_id) or 0
+        
         # Trigger backup after update
         background_tasks.add_task(automated_backup)
         
-        return {"message": "Milestone updated successfully"}
+        return {"message": "Milestone updated successfully", "reflowed_milestones": reflowed}
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error updating milestone {milestone_id}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/admin/milestones/reflow")
+async def reflow_milestone_ranges(
+    background_tasks: BackgroundTasks,
+    from_milestone_id: Optional[str] = None,
+    admin_verified: bool = Depends(verify_admin_access)
+):
+    """Recompute cumulative milestone question ranges, from a milestone onwards or for all (Admin only)"""
+    try:
+        updated = await db_manager.reflow_milestone_ranges(from_milestone_id)
+        if updated is None:
+            raise HTTPException(status_code=404, detail="Milestone not found")
+        
+        if updated:
+            background_tasks.add_task(automated_backup)
+        
+        return {"message": f"Re-flowed {updated} milestone ranges", "updated": updated}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error re-flowing milestone ranges: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.put("/api/milestones/{milestone_id}/payment-status")
 async def update_payment_status(
     milestone_id: str,
@@ -716,6 +889,11 @@ async def health_check():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker, served from memory"""
+    return Response(content=registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/api/db-status")
 async def get_database_status():
     """Get database connection status"""
@@ -757,21 +935,15 @@ async def export_pages_csv():
         writer = csv.DictWriter(output, fieldnames=fieldnames)
         writer.writeheader()
         
+        # Determine milestones based on cumulative range
+        labels = export_milestone_labels(pages, milestones)
+        
         cumulative = 0
-        for i, page in enumerate(pages, 1):
+        for i, (page, milestone) in enumerate(zip(pages, labels), 1):
             page_start = cumulative + 1
             cumulative += page.get('total_questions', 0)
             page_end = cumulative
             
-            # Determine milestone based on cumulative range
-            milestone = "Beyond"
-            for m in milestones:
-                m_end = m.get('question_range_end', m.get('end_question', 0))
-                if page_end <= m_end:
-                    ms_num = m.get('milestone_number', 1)
-                    milestone = f"M{ms_num - 1}" if ms_num > 1 else "M1"
-                    break
-            
             # Write row
             writer.writerow({
                 'S.NO.': i,
@@ -819,21 +991,8 @@ async def export_summary():
         
         # Milestone breakdown
         milestone_stats = {}
-        cumulative = 0
         
-        for page in pages:
-            page_start = cumulative + 1
-            cumulative += page.get('total_questions', 0)
-            page_end = cumulative
-            
-            milestone = "Beyond"
-            for m in milestones:
-                m_end = m.get('question_range_end', m.get('end_question', 0))
-                if page_end <= m_end:
-                    ms_num = m.get('milestone_number', 1)
-                    milestone = f"M{ms_num - 1}" if ms_num > 1 else "M1"
-                    break
-            
+        for page, milestone in zip(pages, export_milestone_labels(pages, milestones)):
             if milestone not in milestone_stats:
                 milestone_stats[milestone] = {'pages': 0, 'total': 0, 'completed': 0}
             
@@ -841,7 +1000,7 @@ async def export_summary():
             milestone_stats[milestone]['total'] += page.get('total_questions', 0)
             milestone_stats[milestone]['completed'] += page.get('completed_questions', 0)
         
-        return {
+        return ORJSONResponse({
             "summary": {
                 "total_pages": total_pages,
                 "total_questions": total_questions,
@@ -850,7 +1009,7 @@ async def export_summary():
             },
             "milestone_breakdown": milestone_stats,
             "export_timestamp": datetime.utcnow().isoformat()
-        }
+        })
         
     except Exception as e:
         logger.error(f"Error getting export summary: {e}")
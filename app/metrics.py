@@ -0,0 +1,282 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Base for labelled metrics; values live in memory, so scraping never does I/O"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self._lock = threading.Lock()  # Pool events arrive on Motor's executor threads
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self.values.get(labels, 0)
+
+    def _samples(self):
+        return [f"{self.name}{_labels(self.label_names, k)} {_number(v)}" for k, v in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def __init__(self, *args, callback: Optional[Callable[[], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.callback = callback
+
+    def set(self, value: float, *labels: str):
+        with self._lock:
+            self.values[labels] = value
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def _samples(self):
+        if self.callback is not None:
+            return [f"{self.name} {_number(self.callback())}"]
+        return super()._samples()
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.values: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            state = self.values.get(labels)
+            if state is None:
+                state = self.values[labels] = [0] * len(self.buckets) + [0.0, 0]
+            state[bisect_left(self.buckets, value)] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self):
+        lines = []
+        for labels, state in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(state[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {state[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route")))
+http_requests = registry.register(Counter(
+    "http_requests_total", "Requests by route template and status", ("method", "route", "status")))
+
+cache_requests = registry.register(Counter(
+    "response_cache_requests_total", "Response cache lookups by result", ("result",)))
+cache_hit_ratio = registry.register(Gauge(
+    "response_cache_hit_ratio", "Share of response cache lookups that were hits",
+    callback=lambda: cache_requests.get("hit") / max(1, cache_requests.get("hit") + cache_requests.get("miss"))))
+
+backup_duration = registry.register(Histogram(
+    "backup_duration_seconds", "Time to write a backup", buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)))
+backup_size = registry.register(Gauge("backup_size_bytes", "Size of the latest backup file"))
+backups = registry.register(Counter("backups_total", "Backups by result", ("result",)))
+write_behind_pending = registry.register(Gauge(
+    "write_behind_pending", "Journaled page updates not yet flushed to the database"))
+write_behind_flushes = registry.register(Counter(
+    "write_behind_flushes_total", "Write-behind journal flush attempts by result", ("result",)))
+idempotent_requests = registry.register(Counter(
+    "idempotent_requests_total", "Requests carrying an Idempotency-Key by outcome", ("result",)))
+backups_reclaimed_bytes = registry.register(Counter(
+    "backups_reclaimed_bytes_total", "Disk space freed by backup retention pruning"))
+
+scheduler_job_duration = registry.register(Histogram(
+    "scheduler_job_duration_seconds", "Scheduled job run time", ("job",), buckets=(0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300)))
+scheduler_job_runs = registry.register(Counter(
+    "scheduler_job_runs_total", "Scheduled job runs by result", ("job", "result")))
+
+loop_lag = registry.register(Histogram(
+    "event_loop_lag_seconds", "How late the event loop woke up a sleeping sampler",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)))
+loop_lag_last = registry.register(Gauge("event_loop_lag_last_seconds", "Most recent event loop lag sample"))
+slow_callbacks = registry.register(Counter(
+    "event_loop_slow_callbacks_total", "Event loop stalls over the monitor threshold, by blocking code location", ("location",)))
+slow_callback_duration = registry.register(Histogram(
+    "event_loop_slow_callback_duration_seconds", "Duration of event loop stalls over the monitor threshold",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)))
+
+mongo_pool_connections = registry.register(Gauge(
+    "mongo_pool_connections", "Open and checked out MongoDB connections", ("state",)))
+mongo_pool_max_size = registry.register(Gauge("mongo_pool_max_size", "Configured maximum MongoDB pool size"))
+mongo_pool_utilization = registry.register(Gauge(
+    "mongo_pool_utilization", "Checked out connections as a share of the maximum pool size",
+    callback=lambda: mongo_pool_connections.get("checked_out") / max(1, mongo_pool_max_size.get())))
+
+
+def observe_backup(seconds: float, path: Optional[str]):
+    backup_duration.observe(seconds)
+    backups.inc("success" if path else "failure")
+    if path:
+        try:
+            backup_size.set(os.path.getsize(path))
+        except OSError:
+            pass
+
+
+def timed_job(name: str, func: Callable) -> Callable:
+    """Wrap a scheduler coroutine so its run time and outcome are recorded"""
+    async def run(*args, **kwargs):
+        started = time.perf_counter()
+        result = "success"
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            result = "failure"
+            raise
+        finally:
+            scheduler_job_duration.observe(time.perf_counter() - started, name)
+            scheduler_job_runs.inc(name, result)
+    run.__name__ = func.__name__
+    return run
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Tracks open and checked out MongoDB connections"""
+
+    def pool_created(self, event):
+        max_size = event.options.get("maxPoolSize")
+        if max_size:
+            mongo_pool_max_size.set(max_size)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        mongo_pool_connections.inc("open")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        mongo_pool_connections.dec("open")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
+    def connection_checked_out(self, event):
+        mongo_pool_connections.inc("checked_out")
+
+    def connection_checked_in(self, event):
+        mongo_pool_connections.dec("checked_out")
+
+
+class LoopLagSampler:
+    """Measures how late the event loop runs a task that sleeps for a fixed interval"""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            loop_lag.observe(lag)
+            loop_lag_last.set(lag)
+
+
+# Global instances
+pool_metrics_listener = PoolMetricsListener()
+loop_lag_sampler = LoopLagSampler()
@@ -0,0 +1,17 @@
+"""Fill in missing page years from the year in the page URL (was fix_years.py)"""
+
+import re
+
+COLLECTION = "pages"
+QUERY = {
+    "page_link": {"$nin": [None, ""]},
+    "$or": [{"year": {"$exists": False}}, {"year": {"$in": [None, "", "N/A"]}}]
+}
+FIELDS = {"page_link": 1}
+
+YEAR_IN_URL = re.compile(r"(20[0-2][0-9])")
+
+
+def migrate(page: dict):
+    match = YEAR_IN_URL.search(str(page["page_link"]))
+    return {"$set": {"year": match.group(1)}} if match else None
@@ -0,0 +1,28 @@
+"""Set the first eight pages' totals to the exact values given by the client (was restore_exact_data.py)"""
+
+COLLECTION = "pages"
+# Overwrites live progress on these pages, so never part of a plain `run`
+MANUAL = True
+FIELDS = {"page_link": 1, "total_questions": 1, "completed_questions": 1, "status": 1}
+
+# page_link -> (total_questions, completed_questions)
+PAGES = {
+    "https://www.iitianacademy.com/jee-main-27-june-2022-paper-shift-2_chemistry/": (30, 30),
+    "https://www.iitianacademy.com/jee-main-27-june-2022-paper-shift-2_maths/": (30, 30),
+    "https://www.iitianacademy.com/jee-main-27-june-2022-paper-shift-2_physics/": (30, 30),
+    "https://www.iitianacademy.com/ap_stats_2018_practice_paper_mcqs/": (40, 40),
+    "https://www.iitianacademy.com/ap_stats_2017_mcqs/": (40, 40),
+    "https://www.iitianacademy.com/ap_stats_2016_mcqs/": (40, 40),
+    "https://www.iitianacademy.com/ap_stats_2015_practice_paper_mcq/": (40, 40),
+    "https://www.iitianacademy.com/ap_stats_2015_multiple_choice/": (40, 0),
+}
+QUERY = {"page_link": {"$in": list(PAGES)}}
+
+
+def migrate(page: dict):
+    total, completed = PAGES[page["page_link"]]
+    status = "Completed" if completed == total else "Pending" if completed == 0 else "In Progress"
+    values = {"total_questions": total, "completed_questions": completed, "status": status}
+    if all(page.get(field) == value for field, value in values.items()):
+        return None
+    return {"$set": values}
@@ -0,0 +1,20 @@
+"""Mark the 27 June 2022 Chemistry page completed and AP Stats 2015 Multiple Choice pending (was fix_data.py)"""
+
+COLLECTION = "pages"
+# Overwrites live progress on these pages, so never part of a plain `run`
+MANUAL = True
+FIELDS = {"page_link": 1, "completed_questions": 1, "status": 1}
+
+# page_link -> (completed_questions, status)
+PAGES = {
+    "https://www.iitianacademy.com/jee-main-27-june-2022-paper-shift-2_chemistry/": (30, "Completed"),
+    "https://www.iitianacademy.com/ap_stats_2015_multiple_choice/": (0, "Pending"),
+}
+QUERY = {"page_link": {"$in": list(PAGES)}}
+
+
+def migrate(page: dict):
+    completed, status = PAGES[page["page_link"]]
+    if (page.get("completed_questions"), page.get("status")) == (completed, status):
+        return None
+    return {"$set": {"completed_questions": completed, "status": status}}
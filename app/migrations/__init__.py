@@ -0,0 +1,166 @@
+import os
+import re
+import time
+import asyncio
+import logging
+import importlib
+from datetime import datetime
+from typing import List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATION_FILE = re.compile(r"^(?P<version>\d{4})_(?P<name>\w+)\.py$")
+APPLIED_COLLECTION = "applied_migrations"
+
+
+class Migration:
+    """A versioned migration file in this package, e.g. ``0001_page_years.py``.
+
+    The module defines ``COLLECTION``, an optional ``QUERY`` selecting the
+    documents to migrate and ``FIELDS`` projection, and ``migrate(document)``
+    returning an update document (e.g. ``{"$set": {...}}``) or None to leave
+    the document alone. ``migrate`` must be idempotent: an interrupted batch is
+    re-read on resume. One-off data corrections that overwrite live values set
+    ``MANUAL = True``; they only run when named with ``run --only``.
+    """
+
+    def __init__(self, version: str, name: str, module):
+        self.version = version
+        self.name = name
+        self.id = f"{version}_{name}"
+        self.module = module
+        self.collection = module.COLLECTION
+        self.query = getattr(module, "QUERY", {})
+        self.fields = getattr(module, "FIELDS", None)
+        self.manual = getattr(module, "MANUAL", False)
+        self.description = (module.__doc__ or name).strip().splitlines()[0]
+
+    def updates(self, documents: List[dict]) -> List[UpdateOne]:
+        operations = []
+        for document in documents:
+            update = self.module.migrate(document)
+            if update:
+                operations.append(UpdateOne({"_id": document["_id"]}, update))
+        return operations
+
+
+def discover() -> List[Migration]:
+    """All migration files, in version order"""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            module = importlib.import_module(f"{__name__}.{filename[:-3]}")
+            migrations.append(Migration(match.group("version"), match.group("name"), module))
+    return migrations
+
+
+class MigrationRunner:
+    """Applies pending migrations in batches, checkpointing after every batch.
+
+    Progress lives in the ``applied_migrations`` collection: the last ``_id``
+    processed is stored with each batch, so a migration that is interrupted
+    resumes after its last completed batch. Documents are read in ``_id`` order,
+    written with one unordered ``bulk_write`` per batch, and the runner sleeps
+    between batches so a live database keeps serving traffic.
+    """
+
+    def __init__(self, database, batch_size: Optional[int] = None, throttle_ms: Optional[float] = None):
+        self.database = database
+        self.applied = database[APPLIED_COLLECTION]
+        self.batch_size = batch_size or int(os.getenv("MIGRATION_BATCH_SIZE", "500"))
+        throttle_ms = throttle_ms if throttle_ms is not None else float(os.getenv("MIGRATION_THROTTLE_MS", "100"))
+        self.throttle = throttle_ms / 1000
+
+    async def status(self) -> List[dict]:
+        """Every migration with its state: pending, running (interrupted) or applied"""
+        records = {record["_id"]: record async for record in self.applied.find({})}
+        statuses = []
+        for migration in discover():
+            record = records.get(migration.id, {})
+            statuses.append({
+                "migration": migration.id,
+                "description": migration.description,
+                "status": record.get("status", "manual" if migration.manual else "pending"),
+                "processed": record.get("processed", 0),
+                "modified": record.get("modified", 0),
+                "applied_at": record.get("applied_at")
+            })
+        return statuses
+
+    async def run(self, dry_run: bool = False, target: Optional[str] = None, only: Optional[str] = None) -> List[dict]:
+        """Apply (or with ``dry_run`` only count) pending migrations up to and including ``target``,
+        or just the ``only`` version (manual migrations run only this way)"""
+        applied = {record["_id"] async for record in self.applied.find({"status": "applied"}, {"_id": 1})}
+        results = []
+        for migration in discover():
+            if only:
+                if migration.version == only and migration.id not in applied:
+                    results.append(await self.apply(migration, dry_run))
+                continue
+            if target and migration.version > target:
+                break
+            if migration.id not in applied and not migration.manual:
+                results.append(await self.apply(migration, dry_run))
+        return results
+
+    async def apply(self, migration: Migration, dry_run: bool = False) -> dict:
+        started = time.perf_counter()
+        collection = self.database[migration.collection]
+        record = {} if dry_run else (await self.applied.find_one({"_id": migration.id}) or {})
+        checkpoint = record.get("checkpoint")
+        processed = record.get("processed", 0)
+        modified = record.get("modified", 0)
+
+        if checkpoint is not None:
+            logger.info(f"⏩ Resuming migration {migration.id} after {processed} documents")
+        elif not dry_run:
+            await self.applied.update_one(
+                {"_id": migration.id},
+                {"$set": {"status": "running", "description": migration.description, "started_at": datetime.utcnow()}},
+                upsert=True
+            )
+
+        while True:
+            query = migration.query
+            if checkpoint is not None:
+                query = {"$and": [migration.query, {"_id": {"$gt": checkpoint}}]}
+            batch = await collection.find(query, migration.fields).sort("_id", 1).limit(self.batch_size).to_list(None)
+            if not batch:
+                break
+
+            operations = migration.updates(batch)
+            if dry_run:
+                modified += len(operations)
+            elif operations:
+                result = await collection.bulk_write(operations, ordered=False)
+                modified += result.modified_count
+            processed += len(batch)
+            checkpoint = batch[-1]["_id"]
+
+            if not dry_run:
+                await self.applied.update_one(
+                    {"_id": migration.id},
+                    {"$set": {"checkpoint": checkpoint, "processed": processed, "modified": modified, "updated_at": datetime.utcnow()}}
+                )
+            if self.throttle:
+                await asyncio.sleep(self.throttle)
+
+        if not dry_run:
+            await self.applied.update_one(
+                {"_id": migration.id},
+                {"$set": {"status": "applied", "applied_at": datetime.utcnow()}, "$unset": {"checkpoint": ""}}
+            )
+        seconds = time.perf_counter() - started
+        logger.info(f"{'🔎 Dry run of' if dry_run else '✅ Applied'} migration {migration.id}: "
+                    f"{processed} documents matched, {modified} {'would change' if dry_run else 'changed'} in {seconds:.1f}s")
+        return {
+            "migration": migration.id,
+            "dry_run": dry_run,
+            "processed": processed,
+            "modified": modified,
+            "seconds": round(seconds, 2)
+        }
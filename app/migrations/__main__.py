@@ -0,0 +1,60 @@
+"""
+Run data migrations against the configured MongoDB database
+
+Usage:
+  python -m app.migrations status
+  python -m app.migrations run [--dry-run] [--target 0002 | --only 0003] [--batch-size 500] [--throttle-ms 100]
+"""
+
+import os
+import sys
+import asyncio
+import argparse
+import logging
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from app.cache import data_version
+from app.migrations import MigrationRunner
+
+load_dotenv()
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+
+async def main(args) -> int:
+    mongodb_uri = os.getenv("MONGODB_URI")
+    if not mongodb_uri or mongodb_uri == "mock":
+        print("❌ MONGODB_URI must point at a MongoDB server (the mock database is rebuilt on every start)")
+        return 1
+
+    client = AsyncIOMotorClient(mongodb_uri)
+    database = client[os.getenv("DATABASE_NAME", "tracker_db")]
+    runner = MigrationRunner(database, batch_size=args.batch_size, throttle_ms=args.throttle_ms)
+    try:
+        if args.command == "status":
+            for entry in await runner.status():
+                print(f"{entry['migration']:<32} {entry['status']:<8} {entry['processed']:>7} processed  {entry['description']}")
+            return 0
+
+        results = await runner.run(dry_run=args.dry_run, target=args.target, only=args.only)
+        if not results:
+            print("✅ No pending migrations")
+        elif not args.dry_run and any(result["modified"] for result in results):
+            # Running workers drop their cached responses
+            await data_version.attach(database)
+            await data_version.bump()
+        return 0
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["status", "run"])
+    parser.add_argument("--dry-run", action="store_true", help="count the documents each migration would change, write nothing")
+    parser.add_argument("--target", help="stop after this migration version")
+    parser.add_argument("--only", help="apply just this migration version (required for manual migrations)")
+    parser.add_argument("--batch-size", type=int, help="documents per bulk write (default MIGRATION_BATCH_SIZE or 500)")
+    parser.add_argument("--throttle-ms", type=float, help="pause between batches (default MIGRATION_THROTTLE_MS or 100)")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -4,6 +4,9 @@ from datetime import datetime
 from typing import List, Optional, Dict, Any
 import asyncio
 from app.models import PageModel, MilestoneSummary
+from app.progress_history import build_progress_event, day_key, since_key, progress_status
+from app.aggregation import reflow_ranges
+from app.backups import iter_backup_documents, write_backup
 
 class MockDatabaseManager:
     """In-memory mock database for testing without MongoDB"""
@@ -11,12 +14,16 @@ class MockDatabaseManager:
     def __init__(self):
         self.pages: List[Dict[str, Any]] = []
         self.milestones: List[Dict[str, Any]] = []
+        self.progress_events: List[Dict[str, Any]] = []
+        self.progress_daily: Dict[str, Dict[str, Any]] = {}
+        self.progress_snapshots: List[Dict[str, Any]] = []
         self.id_counter = 1
-        self.milestone_counter = 1
+        self.counters: Dict[str, int] = {}
         
         # Add some sample data
         self._add_sample_data()
         self._add_sample_milestones()
+        self.seed_milestone_counter()
     
     def _add_sample_data(self):
         """Add sample pages for demonstration"""
@@ -85,6 +92,7 @@ class MockDatabaseManager:
         page_data["updated_at"] = datetime.utcnow()
         
         self.pages.append(page_data)
+        self._record_progress(build_progress_event(page_id, None, page_data))
         print(f"✅ Created page: {page_data['page_name']} (ID: {page_id})")
         return page_id
     
@@ -99,21 +107,87 @@ class MockDatabaseManager:
         """Get all pages"""
         return [page.copy() for page in self.pages]
     
+    async def get_change_fingerprint(self) -> dict:
+        """Per-collection (count, last update) fingerprint for change polling"""
+        return {
+            "pages": (len(self.pages), max((p.get("updated_at") for p in self.pages), default=None)),
+            "milestones": (len(self.milestones), max((m.get("updated_at") for m in self.milestones), default=None))
+        }
+    
     async def update_page(self, page_id: str, update_data: dict) -> bool:
         """Update a page"""
         for i, page in enumerate(self.pages):
             if page["_id"] == page_id:
+                previous = page.copy()
                 self.pages[i].update(update_data)
                 self.pages[i]["updated_at"] = datetime.utcnow()
+                self._record_progress(build_progress_event(page_id, previous, self.pages[i]))
                 print(f"✅ Updated page: {page['page_name']}")
                 return True
         return False
     
+    async def update_page_progress(self, page_id: str, completed_questions: int, status: Optional[str] = None) -> Optional[dict]:
+        """Set a page's completed count and derived status, if it doesn't exceed the total"""
+        for page in self.pages:
+            if page["_id"] == page_id and page.get("total_questions", 0) >= completed_questions:
+                previous = page.copy()
+                page["completed_questions"] = completed_questions
+                page["status"] = progress_status(page.get("total_questions"), completed_questions, status, page.get("status"))
+                page["updated_at"] = datetime.utcnow()
+                self._record_progress(build_progress_event(page_id, previous, page))
+                print(f"✅ Updated page: {page['page_name']}")
+                return page.copy()
+        return None
+    
+    def _record_progress(self, event: Optional[dict]):
+        """Append a progress event and fold it into its daily rollup"""
+        if event is None:
+            return
+        self.progress_events.append(event)
+        key = day_key(event["timestamp"])
+        rollup = self.progress_daily.setdefault(key, {"_id": key, "completed": 0, "events": 0})
+        rollup["completed"] += event["delta"]
+        rollup["events"] += 1
+        rollup["updated_at"] = datetime.utcnow()
+    
+    async def get_daily_progress(self, days: Optional[int] = None, updated_since: Optional[datetime] = None) -> List[dict]:
+        """Daily progress rollups, oldest first"""
+        start = since_key(days) or ""
+        return [
+            rollup.copy() for key, rollup in sorted(self.progress_daily.items())
+            if key >= start and (updated_since is None or rollup["updated_at"] >= updated_since)
+        ]
+    
+    async def get_progress_events(self, start: Optional[datetime], end: datetime) -> List[dict]:
+        """Progress events with start < timestamp <= end, oldest first"""
+        return [
+            event.copy() for event in self.progress_events
+            if (start is None or event["timestamp"] > start) and event["timestamp"] <= end
+        ]
+    
+    async def get_history_start(self) -> Optional[datetime]:
+        """When progress history begins: the earliest recorded event or snapshot"""
+        starts = [event["timestamp"] for event in self.progress_events[:1]]
+        starts += [snapshot["taken_at"] for snapshot in self.progress_snapshots[:1]]
+        return min(starts) if starts else None
+    
+    async def save_progress_snapshot(self, snapshot: dict):
+        """Store a summary snapshot"""
+        self.progress_snapshots.append(snapshot)
+        self.progress_snapshots.sort(key=lambda s: s["taken_at"])
+    
+    async def get_nearest_progress_snapshot(self, as_of: datetime, after: bool = False) -> Optional[dict]:
+        """Latest snapshot taken at or before ``as_of``, or the earliest one after it"""
+        if after:
+            return next((s for s in self.progress_snapshots if s["taken_at"] > as_of), None)
+        return next((s for s in reversed(self.progress_snapshots) if s["taken_at"] <= as_of), None)
+    
     async def delete_page(self, page_id: str) -> bool:
         """Delete a page"""
         for i, page in enumerate(self.pages):
             if page["_id"] == page_id:
                 deleted_page = self.pages.pop(i)
+                self._record_progress(build_progress_event(page_id, deleted_page, None))
                 print(f"✅ Deleted page: {deleted_page['page_name']}")
                 return True
         return False
@@ -151,24 +225,36 @@ class MockDatabaseManager:
     
     async def backup_data(self) -> str:
         """Create a backup of all data"""
-        pages = await self.get_all_pages()
+        # Both collections are copied in one synchronous step, so no write can land in between
         backup_data = {
             "backup_timestamp": datetime.utcnow().isoformat(),
-            "pages": pages,
-            "summary": await self.get_milestone_summary()
+            "pages": [page.copy() for page in self.pages],
+            "milestones": [milestone.copy() for milestone in self.milestones]
         }
         
-        backup_filename = f"tracker_backup_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
-        backup_path = os.path.join("backups", backup_filename)
-        
-        # Ensure backups directory exists
-        os.makedirs("backups", exist_ok=True)
+        backup_path, written = await asyncio.to_thread(write_backup, backup_data)
+        print(f"✅ Mock backup {'created' if written else 'unchanged'}: {backup_path}")
+        return backup_path
+
+    async def restore_backup(self, backup_path: str) -> dict:
+        """Replace pages and milestones with those in a backup file"""
+        restored = {}
+        for name, document in iter_backup_documents(backup_path, object_ids=False):
+            if document is None:
+                restored[name] = []
+            else:
+                restored[name].append(document)
         
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, indent=2, default=str)
+        if "pages" in restored:
+            self.pages = restored["pages"]
+            numeric_ids = [int(page["_id"]) for page in self.pages if str(page.get("_id", "")).isdigit()]
+            self.id_counter = max(numeric_ids, default=0) + 1
+        if "milestones" in restored:
+            self.milestones = restored["milestones"]
+            self.seed_milestone_counter()
         
-        print(f"✅ Mock backup created: {backup_path}")
-        return backup_path
+        print(f"✅ Mock restore from {backup_path}")
+        return {"backup": backup_path, "documents": {name: len(documents) for name, documents in restored.items()}}
 
     def _add_sample_milestones(self):
         """Add sample milestones for demonstration"""
@@ -189,16 +275,26 @@ class MockDatabaseManager:
         self.milestones = sample_milestones
 
     # Milestone Management Methods
+    def seed_milestone_counter(self):
+        """Reset the milestone counter to match existing milestones"""
+        self.counters["milestone_number"] = max((m.get("milestone_number", 0) for m in self.milestones), default=0)
+        self.counters["end_question"] = max((m.get("end_question", 0) for m in self.milestones), default=0)
+    
+    def allocate_milestone(self, total_questions: int) -> tuple:
+        """Reserve the next milestone number and question range: (number, start, end)"""
+        self.counters["milestone_number"] += 1
+        self.counters["end_question"] += total_questions
+        end_question = self.counters["end_question"]
+        return self.counters["milestone_number"], end_question - total_questions + 1, end_question
+    
     async def create_milestone(self, milestone_data: dict) -> str:
         """Create a new milestone"""
-        milestone_id = f"milestone_{self.milestone_counter}"
+        milestone_id = f"milestone_{milestone_data['milestone_number']}"
         milestone_data["_id"] = milestone_id
-        milestone_data["milestone_number"] = self.milestone_counter
         milestone_data["created_at"] = datetime.utcnow()
         milestone_data["updated_at"] = datetime.utcnow()
         
         self.milestones.append(milestone_data)
-        self.milestone_counter += 1
         
         print(f"✅ Mock milestone created: {milestone_id}")
         return milestone_id
@@ -224,11 +320,34 @@ class MockDatabaseManager:
                 return True
         return False
 
+    async def reflow_milestone_ranges(self, from_milestone_id: Optional[str] = None) -> Optional[int]:
+        """Recompute cumulative question ranges from a milestone onwards (all milestones by default)"""
+        ordered = sorted(self.milestones, key=lambda m: m.get("created_at") or datetime.min)
+        start_question = 1
+        if from_milestone_id:
+            index = next((i for i, m in enumerate(ordered) if m["_id"] == from_milestone_id), None)
+            if index is None:
+                return None
+            if ordered[index].get("start_question") is not None:
+                start_question = ordered[index]["start_question"]
+                ordered = ordered[index:]
+        
+        changed, end_question = reflow_ranges(ordered, start_question)
+        for milestone, start, end in changed:
+            milestone.update(start_question=start, end_question=end, question_range=f"{start}-{end}", updated_at=datetime.utcnow())
+        if changed:
+            self.counters["end_question"] = end_question
+        return len(changed)
+
     async def delete_milestone(self, milestone_id: str) -> bool:
         """Delete a milestone by its ID"""
         for i, milestone in enumerate(self.milestones):
             if milestone["_id"] == milestone_id:
                 del self.milestones[i]
+                if (milestone.get("milestone_number"), milestone.get("end_question")) == \
+                        (self.counters["milestone_number"], self.counters["end_question"]) and "start_question" in milestone:
+                    self.counters["milestone_number"] -= 1
+                    self.counters["end_question"] = milestone["start_question"] - 1
                 print(f"✅ Mock milestone deleted: {milestone_id}")
                 return True
         return False
@@ -0,0 +1,102 @@
+import os
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+SUBJECT_PATTERNS = {
+    r'chemistry': 'Chemistry',
+    r'physics': 'Physics',
+    r'maths?': 'Maths',
+    r'mathematics?': 'Maths',
+    r'ap_stats?': 'AP Stats',
+    r'statistics?': 'Statistics',
+    r'biology': 'Biology',
+    r'english': 'English'
+}
+# Days of rollups needed before they replace the since-creation average
+MIN_RATE_HISTORY_DAYS = int(os.getenv("PROGRESS_RATE_MIN_DAYS", "7"))
+
+
+def effective_completed(page: dict) -> int:
+    """Completed questions of a page, counting a Completed page with no count as fully done"""
+    completed = page.get("completed_questions", 0) or 0
+    if page.get("status") == "Completed" and completed == 0:
+        completed = page.get("total_questions", 0) or 0
+    return completed
+
+
+def page_subject(page: dict) -> str:
+    """Subject of a page, taken from its URL when missing or left at General"""
+    page_link = page.get("page_link", "")
+    if page_link and (not page.get("subject") or page.get("subject") == "General"):
+        url_str = str(page_link)
+        for pattern, subject in SUBJECT_PATTERNS.items():
+            if re.search(pattern, url_str, re.IGNORECASE):
+                return subject
+        return "General"
+    return page.get("subject") or "General"
+
+
+def progress_status(total: int, completed: int, requested: Optional[str], current: Optional[str]) -> str:
+    """Status after setting a page's completed count (mirrors the update_page_progress pipeline)"""
+    if completed == total:
+        return "Completed"
+    if completed > 0:
+        return "Completed" if requested == "Completed" else "In Progress"
+    return requested or current
+
+
+def day_key(timestamp: datetime) -> str:
+    """Daily rollup bucket (UTC date) for a timestamp"""
+    return timestamp.strftime("%Y-%m-%d")
+
+
+def build_progress_event(page_id: str, before: Optional[dict], after: Optional[dict]) -> Optional[dict]:
+    """Progress event for a page write (``before`` is None on create, ``after`` on delete),
+    or None if neither completion, status nor size changed"""
+    completed_before = effective_completed(before) if before else 0
+    completed_after = effective_completed(after) if after else 0
+    status_before = before.get("status") if before else None
+    status_after = after.get("status") if after else None
+    total_before = before.get("total_questions", 0) if before else 0
+    total_after = after.get("total_questions", 0) if after else 0
+    if (completed_before, status_before, total_before) == (completed_after, status_after, total_after):
+        return None
+    return {
+        "page_id": str(page_id),
+        "subject": page_subject(after or before),
+        "completed_before": completed_before,
+        "completed_after": completed_after,
+        "delta": completed_after - completed_before,
+        "status_before": status_before,
+        "status_after": status_after,
+        "total_before": total_before,
+        "total_after": total_after,
+        "timestamp": datetime.utcnow()
+    }
+
+
+def day_gain(rollup: dict) -> int:
+    """Questions gained on a rollup's day; resets, corrections and deletions don't count as negative progress"""
+    return max(0, rollup.get("completed", 0))
+
+
+def daily_rate_from_rollups(rollups: List[dict], today: Optional[datetime] = None,
+                            min_days: int = MIN_RATE_HISTORY_DAYS) -> Optional[float]:
+    """Questions completed per day since history began, or None until the history covers ``min_days``"""
+    if not rollups:
+        return None
+    today = today or datetime.utcnow()
+    first_day = datetime.strptime(rollups[0]["_id"], "%Y-%m-%d")
+    days_elapsed = (today.date() - first_day.date()).days + 1
+    if days_elapsed < min_days:
+        return None
+    return sum(day_gain(r) for r in rollups) / days_elapsed
+
+
+def since_key(days: Optional[int], today: Optional[datetime] = None) -> Optional[str]:
+    """First rollup bucket of a trailing window of ``days`` days"""
+    if days is None:
+        return None
+    today = today or datetime.utcnow()
+    return day_key(today - timedelta(days=days - 1))
@@ -0,0 +1,136 @@
+import os
+import copy
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from app.progress_history import effective_completed, page_subject
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INTERVAL_HOURS = float(os.getenv("SNAPSHOT_INTERVAL_HOURS", "6"))
+
+
+def _counter(counters: dict, key: str) -> dict:
+    return counters.setdefault(key, {"pages": 0, "completed_questions": 0, "total_questions": 0})
+
+
+def _add_page(snapshot: dict, subject: str, status: Optional[str], completed: int, total: int, sign: int):
+    """Add (sign=1) or remove (sign=-1) one page's contribution to the counters"""
+    if status is None:
+        return
+    for counter in (_counter(snapshot["by_status"], status), _counter(snapshot["by_subject"], subject)):
+        counter["pages"] += sign
+        counter["completed_questions"] += sign * completed
+        counter["total_questions"] += sign * total
+
+
+def build_snapshot(pages: List[dict], milestones: List[dict], taken_at: datetime) -> dict:
+    """Compact per-status and per-subject counters plus the milestone ranges"""
+    snapshot = {"taken_at": taken_at, "by_status": {}, "by_subject": {}}
+    for page in pages:
+        _add_page(snapshot, page_subject(page), page.get("status", "Pending"),
+                  effective_completed(page), page.get("total_questions", 0), 1)
+    snapshot["milestones"] = [
+        {
+            "milestone_id": str(m.get("_id", "")),
+            "milestone_number": m.get("milestone_number"),
+            "title": m.get("title"),
+            "start_question": m.get("start_question", 0),
+            "end_question": m.get("end_question", 0)
+        }
+        for m in sorted(milestones, key=lambda m: m.get("start_question", 0))
+    ]
+    return snapshot
+
+
+def apply_events(snapshot: dict, events: List[dict], reverse: bool = False) -> dict:
+    """Replay progress events on a copy of a snapshot, or undo them with ``reverse``"""
+    snapshot = copy.deepcopy(snapshot)
+    for event in reversed(events) if reverse else events:
+        old = (event["status_before"], event["completed_before"], event["total_before"])
+        new = (event["status_after"], event["completed_after"], event["total_after"])
+        if reverse:
+            old, new = new, old
+        subject = event.get("subject") or "General"
+        _add_page(snapshot, subject, *old, -1)
+        _add_page(snapshot, subject, *new, 1)
+    return snapshot
+
+
+def summarize(snapshot: dict) -> dict:
+    """Totals and per-milestone progress from snapshot counters"""
+    by_status = {k: v for k, v in snapshot["by_status"].items() if v["pages"]}
+    by_subject = {k: v for k, v in snapshot["by_subject"].items() if v["pages"]}
+    completed = sum(c["completed_questions"] for c in by_status.values())
+    total = sum(c["total_questions"] for c in by_status.values())
+
+    by_milestone = []
+    for milestone in snapshot["milestones"]:
+        start, end = milestone["start_question"], milestone["end_question"]
+        milestone_total = end - start + 1
+        milestone_completed = min(milestone_total, max(0, completed - start + 1))
+        by_milestone.append({
+            **milestone,
+            "completed_questions": milestone_completed,
+            "progress_percentage": round(milestone_completed / milestone_total * 100, 2) if milestone_total > 0 else 0
+        })
+
+    return {
+        "total_pages": sum(c["pages"] for c in by_status.values()),
+        "completed_questions": completed,
+        "total_questions": total,
+        "progress_percentage": round(completed / total * 100, 2) if total > 0 else 0,
+        "by_status": by_status,
+        "by_subject": by_subject,
+        "by_milestone": by_milestone
+    }
+
+
+async def take_snapshot(db_manager) -> dict:
+    """Snapshot the current pages and milestones"""
+    taken_at = datetime.utcnow()
+    snapshot = build_snapshot(await db_manager.get_all_pages(), await db_manager.get_all_milestones(), taken_at)
+    await db_manager.save_progress_snapshot(copy.deepcopy(snapshot))
+    logger.info(f"📸 Progress snapshot taken at {taken_at.isoformat()}")
+    return snapshot
+
+
+async def progress_as_of(db_manager, as_of: datetime) -> dict:
+    """Summary counters at ``as_of``: the nearest snapshot with the events in between replayed or undone.
+
+    Before history began, changes made between ``as_of`` and the first recorded
+    one are unknown, so the counters are only as of that point and the result
+    is marked incomplete.
+    """
+    before = await db_manager.get_nearest_progress_snapshot(as_of)
+    after = await db_manager.get_nearest_progress_snapshot(as_of, after=True)
+    if before is None and after is None:
+        after = await take_snapshot(db_manager)
+    history_starts_at = None if before is not None else await db_manager.get_history_start()
+
+    if after is None or (before is not None and as_of - before["taken_at"] <= after["taken_at"] - as_of):
+        events = await db_manager.get_progress_events(before["taken_at"], as_of)
+        snapshot = apply_events(before, events)
+    else:
+        events = await db_manager.get_progress_events(as_of, after["taken_at"])
+        snapshot = apply_events(after, events, reverse=True)
+
+    return {
+        "as_of": as_of.isoformat(),
+        "snapshot_taken_at": snapshot["taken_at"].isoformat(),
+        "events_applied": len(events),
+        "complete": history_starts_at is None or as_of >= history_starts_at,
+        "history_starts_at": history_starts_at.isoformat() if history_starts_at else None,
+        **summarize(snapshot)
+    }
+
+
+def parse_as_of(value: str) -> datetime:
+    """Parse an ISO date or datetime (UTC); a bare date means the end of that day"""
+    if "T" not in value and " " not in value:
+        return datetime.strptime(value, "%Y-%m-%d") + timedelta(days=1, microseconds=-1)
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+    return parsed
@@ -0,0 +1,195 @@
+import json
+import time
+import asyncio
+import logging
+import functools
+import threading
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+
+from fastapi.routing import APIRoute
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import http_request_duration, http_requests
+
+logger = logging.getLogger(__name__)
+
+
+class RequestTiming:
+    """Where one request spent its time: Mongo round trips, documents returned, serialization"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_calls = 0
+        self.db_docs = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.endpoint_returned: Optional[float] = None
+        self._lock = threading.Lock()  # Mongo events arrive on Motor's executor threads
+
+    def add_db(self, seconds: float, docs: int):
+        with self._lock:
+            self.db_calls += 1
+            self.db_docs += docs
+            self.db_seconds += seconds
+
+    def add_serialize(self, seconds: float):
+        self.serialize_seconds += seconds
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        return ", ".join([
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.db_calls} queries, {self.db_docs} docs"',
+            f"serialize;dur={self.serialize_seconds * 1000:.2f}",
+            f"total;dur={self.elapsed() * 1000:.2f}",
+        ])
+
+
+current_timing: ContextVar[Optional[RequestTiming]] = ContextVar("current_timing", default=None)
+
+
+def _reply_documents(reply: dict) -> int:
+    cursor = reply.get("cursor")
+    if cursor:
+        return len(cursor.get("firstBatch") or cursor.get("nextBatch") or [])
+    if reply.get("value") is not None:  # findAndModify
+        return 1
+    return 0
+
+
+class DatabaseTimingListener(monitoring.CommandListener):
+    """Attributes every Mongo command to the request that issued it.
+
+    Motor runs commands on executor threads with the caller's context copied,
+    so the request's RequestTiming is visible here.
+    """
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        timing = current_timing.get()
+        if timing is not None:
+            timing.add_db(event.duration_micros / 1_000_000, _reply_documents(event.reply))
+
+    def failed(self, event):
+        timing = current_timing.get()
+        if timing is not None:
+            timing.add_db(event.duration_micros / 1_000_000, 0)
+
+
+def record_serialization(seconds: float):
+    timing = current_timing.get()
+    if timing is not None:
+        timing.add_serialize(seconds)
+
+
+def record_render(started: float):
+    """Count a response render as serialization.
+
+    A render after the endpoint returned (FastAPI building the response from a
+    returned dict) is counted from that moment, so FastAPI's jsonable_encoder
+    pass is included, not just the final encode.
+    """
+    timing = current_timing.get()
+    if timing is None:
+        return
+    if timing.endpoint_returned is not None and timing.endpoint_returned <= started:
+        started = timing.endpoint_returned
+    timing.add_serialize(time.perf_counter() - started)
+
+
+def _mark_return(endpoint: Callable) -> Callable:
+    """Wrap an endpoint to note when it returns; the signature is kept for FastAPI's introspection"""
+    def mark():
+        timing = current_timing.get()
+        if timing is not None:
+            timing.endpoint_returned = time.perf_counter()
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            result = await endpoint(*args, **kwargs)
+            mark()
+            return result
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            result = endpoint(*args, **kwargs)
+            mark()
+            return result
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """API route that marks when its endpoint returns, for the serialize timing"""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _mark_return(endpoint), **kwargs)
+
+
+_route_paths: Dict[int, str] = {}
+
+
+def route_label(scope: Scope) -> str:
+    """Route template (e.g. /api/page/{page_id}) of a routed request, to keep labels low-cardinality"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "/static" if scope.get("path", "").startswith("/static/") else "unmatched"
+    if not _route_paths:
+        for route in scope["app"].router.routes:
+            if getattr(route, "endpoint", None) is not None:
+                _route_paths.setdefault(id(route.endpoint), route.path)
+    return _route_paths.get(id(endpoint), scope.get("path", ""))
+
+
+class TimingMiddleware:
+    """Adds a Server-Timing header and a structured log line to every API and page request"""
+
+    def __init__(self, app: ASGIApp, skip_prefixes: tuple = ("/static/",)):
+        self.app = app
+        self.skip_prefixes = skip_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timing.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_timing.reset(token)
+            route = route_label(scope)
+            duration = timing.elapsed()
+            http_request_duration.observe(duration, scope["method"], route)
+            http_requests.inc(scope["method"], route, str(status_code))
+            logger.info(json.dumps({
+                "event": "request",
+                "method": scope["method"],
+                "route": route,
+                "status": status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "db_calls": timing.db_calls,
+                "db_docs": timing.db_docs,
+                "db_ms": round(timing.db_seconds * 1000, 2),
+                "serialize_ms": round(timing.serialize_seconds * 1000, 2),
+            }))
+
+
+# Global Mongo command listener, registered on the Motor client
+db_timing_listener = DatabaseTimingListener()
@@ -0,0 +1,258 @@
+import os
+import sqlite3
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from bson import json_util
+
+from app.backups import EXTENDED_JSON
+from app.metrics import write_behind_pending, write_behind_flushes
+
+try:
+    import fcntl
+except ImportError:  # Windows - local runs are single process anyway
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# (sequence, page_id, update, accepted_at)
+JournalEntry = Tuple[int, str, dict, datetime]
+
+
+class PartialFlushError(Exception):
+    """Raised by the flush callback when only the first ``applied`` entries were written"""
+
+    def __init__(self, applied: int, error: Exception):
+        super().__init__(str(error))
+        self.applied = applied
+
+
+class WriteBehindQueue:
+    """Optional write-behind mode for page updates (enable with WRITE_BEHIND=1).
+
+    Accepted updates are appended to a local SQLite journal and acknowledged
+    right away; a background task flushes them to the database in ordered
+    batches and retries with backoff while it is slow or down, so a write that
+    was acknowledged is not lost. Until flushed, pending updates are overlaid
+    on page reads of this worker. Other workers see them after the flush.
+    Workers sharing a journal take turns flushing it under a file lock, so
+    each update is written once and in journal order.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+        self.path = os.getenv("WRITE_BEHIND_JOURNAL", os.path.join("data", "write_behind.sqlite3"))
+        self.batch_size = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "100"))
+        self.flush_interval = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "0.5"))
+        self.max_attempts = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "20"))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock_file = None
+        self._conn_lock = threading.Lock()
+        self._overlay: Dict[str, dict] = {}
+        self._apply: Optional[Callable[[List[JournalEntry]], Awaitable[int]]] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        # Held by append and by overlay rebuilds, so a rebuild never drops a just-journaled update
+        self._overlay_lock: Optional[asyncio.Lock] = None
+        self._failures = 0
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None
+
+    def start(self, apply: Callable[[List[JournalEntry]], Awaitable[int]]):
+        """Open the journal and flush it in the background with ``apply``, which
+        writes entries in order and returns how many it applied"""
+        if self._task:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS journal ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, page_id TEXT NOT NULL, update_doc TEXT NOT NULL, "
+            "accepted_at TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, "
+            "dead INTEGER NOT NULL DEFAULT 0)"
+        )
+        if fcntl is not None:
+            self._lock_file = open(self.path + ".lock", "w")
+        self._overlay = self._load_overlay()
+        self._apply = apply
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._overlay_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📝 Write-behind journal at {self.path} ({self.pending_count} pending writes)")
+
+    async def stop(self):
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.warning(f"Write-behind journal not fully flushed at shutdown ({e}); it resumes on next start")
+        self._conn.close()
+        self._conn = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @property
+    def pending_count(self) -> int:
+        return self._query("SELECT COUNT(*) FROM journal WHERE dead = 0")[0][0] if self._conn else 0
+
+    def has_pending(self, page_id: str) -> bool:
+        return page_id in self._overlay
+
+    async def append(self, page_id: str, update: dict):
+        """Durably journal a page update; returns once it is on disk"""
+        accepted_at = datetime.utcnow()
+        async with self._overlay_lock:
+            await asyncio.to_thread(
+                self._execute,
+                "INSERT INTO journal (page_id, update_doc, accepted_at) VALUES (?, ?, ?)",
+                (page_id, json_util.dumps(update, json_options=EXTENDED_JSON), accepted_at.isoformat())
+            )
+            self._overlay.setdefault(page_id, {}).update(update, updated_at=accepted_at)
+        write_behind_pending.set(self.pending_count)
+        self._wakeup.set()
+
+    def overlay(self, pages: List[dict]) -> List[dict]:
+        """Pages with their pending updates applied"""
+        if not self._overlay:
+            return pages
+        for page in pages:
+            pending = self._overlay.get(str(page.get("_id")))
+            if pending:
+                page.update(pending)
+        return pages
+
+    async def settle(self, page_id: str):
+        """Flush pending updates of a page before it is written directly, so writes stay in order"""
+        while self.has_pending(page_id):
+            # Nothing to flush is fine if another flusher already wrote them
+            if not await self.flush() and self.has_pending(page_id):
+                raise RuntimeError(f"Pending writes of page {page_id} could not be flushed")
+
+    @asynccontextmanager
+    async def _journal_locked(self):
+        """Hold the journal from selecting a batch until it is deleted, across workers"""
+        async with self._flush_lock:
+            if self._lock_file is None:
+                yield
+                return
+            # Polled rather than blocking in a thread, so a cancelled flush can't take the lock later
+            while True:
+                try:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    await asyncio.sleep(0.05)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    async def flush(self) -> int:
+        """Flush one batch of journaled updates, oldest first; returns how many were applied"""
+        async with self._journal_locked():
+            rows = await asyncio.to_thread(
+                self._query,
+                "SELECT seq, page_id, update_doc, accepted_at, attempts FROM journal WHERE dead = 0 ORDER BY seq LIMIT ?",
+                (self.batch_size,)
+            )
+            if not rows:
+                # Another worker may have flushed this worker's updates
+                await self._rebuild_overlay()
+                return 0
+            entries = [
+                (seq, page_id, json_util.loads(update_doc, json_options=EXTENDED_JSON), datetime.fromisoformat(accepted_at))
+                for seq, page_id, update_doc, accepted_at, _ in rows
+            ]
+            try:
+                applied = await self._apply(entries)
+                error = None
+            except PartialFlushError as e:
+                applied, error = e.applied, e
+            except Exception as e:
+                applied, error = 0, e
+
+            if applied:
+                await asyncio.to_thread(self._execute, "DELETE FROM journal WHERE seq <= ?", (entries[applied - 1][0],))
+            if error is not None:
+                # The first unapplied entry is the one that failed (or the batch never reached the database)
+                seq, attempts = rows[applied][0], rows[applied][4] + 1
+                dead = int(attempts >= self.max_attempts)
+                await asyncio.to_thread(
+                    self._execute, "UPDATE journal SET attempts = ?, last_error = ?, dead = ? WHERE seq = ?",
+                    (attempts, str(error), dead, seq)
+                )
+                if dead:
+                    logger.error(f"Giving up on journaled write {seq} after {attempts} attempts: {error}")
+                write_behind_flushes.inc("failure")
+            else:
+                write_behind_flushes.inc("success")
+
+            await self._rebuild_overlay()
+            write_behind_pending.set(self.pending_count)
+            if error is not None and not applied:
+                raise error
+            return applied
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                while await self.flush():
+                    pass
+                self._failures = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._failures += 1
+                backoff = min(60, 2 ** self._failures)
+                logger.warning(f"Write-behind flush failed ({e}), {self.pending_count} writes pending, retrying in {backoff}s")
+                await asyncio.sleep(backoff)
+
+    async def _rebuild_overlay(self):
+        """Re-read pending updates from the journal; appends wait, so none lands in between"""
+        async with self._overlay_lock:
+            self._overlay = await asyncio.to_thread(self._load_overlay)
+
+    def _load_overlay(self) -> Dict[str, dict]:
+        overlay = {}
+        for page_id, update_doc, accepted_at in self._query(
+            "SELECT page_id, update_doc, accepted_at FROM journal WHERE dead = 0 ORDER BY seq"
+        ):
+            overlay.setdefault(page_id, {}).update(
+                json_util.loads(update_doc, json_options=EXTENDED_JSON), updated_at=datetime.fromisoformat(accepted_at)
+            )
+        return overlay
+
+    def _execute(self, sql: str, params: tuple = ()):
+        with self._conn_lock:
+            self._conn.execute(sql, params)
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        with self._conn_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+# Global write-behind queue instance
+write_behind = WriteBehindQueue()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+API benchmark: every read endpoint at realistic data sizes, in-process over ASGI
+
+For each dataset size the app is started with its real lifespan, seeded with
+synthetic pages and milestones, and each endpoint is hit --requests times with
+--concurrency requests in flight, both cold (response cache cleared before every
+request) and warm. Reports p50/p95/p99 latency, throughput, response size and
+memory allocated while serving one cold request.
+
+Backends: the mock in-memory database (default) or a local MongoDB
+(--mongodb-uri; the target database is dropped and reseeded, so its name must
+start with "bench"). The mock has its own get_all_milestones and
+get_milestone_summary, so the Mongo query paths behind the milestone and
+summary endpoints are only measured with --mongodb-uri. The backend actually
+used is recorded in the report, and reports from different backends are not
+compared.
+
+Usage:
+  python benchmarks/bench_api.py [--pages 1000,10000] [--milestones 10,500]
+                                 [--report report.json] [--compare baseline.json]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.synthetic import make_dataset, for_mongo
+
+PUBLIC_ENDPOINTS = [
+    "/health",
+    "/api/pages",
+    "/api/progress",
+    "/api/public/milestones",
+    "/api/reminder",
+    "/api/forecast",
+    "/api/pivot?group_by=subject",
+    "/api/pivot?group_by=milestone",
+    "/api/export/csv",
+    "/api/export/summary",
+]
+ADMIN_ENDPOINTS = [
+    "/api/milestones",
+]
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return "unknown"
+
+
+async def seed(db_manager, pages: list, milestones: list):
+    """Replace the backend's data with the synthetic dataset"""
+    from app import database
+    from app.cache import data_version
+    from app.forecast import forecaster
+
+    if database.USE_MOCK_DB:
+        db_manager.mock_db.pages = [dict(p) for p in pages]
+        db_manager.mock_db.milestones = [dict(m) for m in milestones]
+    else:
+        db = db_manager.database
+        for name in ("pages", "milestones", "progress_events", "progress_daily", "progress_snapshots"):
+            await db[name].delete_many({})
+        for start in range(0, len(pages), 5000):
+            await db["pages"].insert_many(for_mongo(pages[start:start + 5000]))
+        await db["milestones"].insert_many(for_mongo(milestones))
+    forecaster.reset()
+    await data_version.bump()
+
+
+async def measure(client, path: str, headers: dict, requests: int, concurrency: int, cold: bool) -> dict:
+    from app.cache import response_cache
+
+    samples = []
+    sizes = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            if cold:
+                response_cache.clear()
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            samples.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}: {response.text[:200]}")
+            sizes.append(len(response.content))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "rps": round(requests / elapsed, 1),
+        "bytes": sizes[-1],
+    }
+
+
+async def allocations(client, path: str, headers: dict) -> dict:
+    """Memory blocks still held and peak memory after serving one cold request"""
+    from app.cache import response_cache
+
+    response_cache.clear()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    await client.get(path, headers=headers)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    diff = after.compare_to(before, "filename")
+    return {
+        "new_blocks": sum(stat.count_diff for stat in diff if stat.count_diff > 0),
+        "net_kb": round(sum(stat.size_diff for stat in diff) / 1024, 1),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+async def run_size(app, page_count: int, milestone_count: int, args) -> dict:
+    import httpx
+    from app.auth import create_admin_token
+    from app.database import db_manager
+
+    pages, milestones = make_dataset(page_count, milestone_count)
+    await seed(db_manager, pages, milestones)
+
+    admin_headers = {"Authorization": f"Bearer {create_admin_token('bench@example.com')}"}
+    results = {}
+    async with httpx.AsyncClient(app=app, base_url="http://bench") as client:
+        for path in PUBLIC_ENDPOINTS + ADMIN_ENDPOINTS:
+            headers = admin_headers if path in ADMIN_ENDPOINTS else {}
+            # Warm up imports, caches and lazily built state
+            await client.get(path, headers=headers)
+            results[path] = {
+                "cold": await measure(client, path, headers, args.requests, args.concurrency, cold=True),
+                "warm": await measure(client, path, headers, args.requests, args.concurrency, cold=False),
+                "alloc": await allocations(client, path, headers),
+            }
+            cold = results[path]["cold"]
+            print(f"   {path:<32} cold p50 {cold['p50_ms']:9.2f} ms  p95 {cold['p95_ms']:9.2f} ms  "
+                  f"warm p50 {results[path]['warm']['p50_ms']:7.2f} ms  "
+                  f"{cold['bytes'] / 1024:8.1f} KB  {results[path]['alloc']['new_blocks']:8d} blocks")
+    return results
+
+
+async def run(args) -> dict:
+    from app.main import app
+
+    from app import database
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": {},
+    }
+    async with app.router.lifespan_context(app):
+        # The app falls back to the mock when MongoDB is unreachable, so record what actually ran
+        backend = "mock" if database.USE_MOCK_DB else "mongodb"
+        report["meta"]["backend"] = backend
+        if args.mongodb_uri and backend == "mock":
+            raise SystemExit(f"❌ Could not connect to {args.mongodb_uri}; refusing to benchmark the mock instead")
+        if backend == "mock":
+            print("⚠️  Benchmarking the mock database: the Mongo milestone and summary query paths are not measured. "
+                  "Use --mongodb-uri for representative numbers.")
+        for page_count in args.pages:
+            for milestone_count in args.milestones:
+                label = f"{page_count}p_{milestone_count}m"
+                print(f"📦 {page_count} pages, {milestone_count} milestones")
+                report["results"][label] = await run_size(app, page_count, milestone_count, args)
+    return report
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Endpoints whose cold p95 got slower than the baseline by more than threshold"""
+    regressions = []
+    for label, endpoints in report["results"].items():
+        for path, result in endpoints.items():
+            base = baseline.get("results", {}).get(label, {}).get(path)
+            if not base:
+                continue
+            before, after = base["cold"]["p95_ms"], result["cold"]["p95_ms"]
+            if before > 0 and after > before * (1 + threshold):
+                regressions.append(f"{label} {path}: p95 {before:.2f} -> {after:.2f} ms (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def int_list(value: str) -> list:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int_list, default=[1000, 10000], help="comma separated page counts (e.g. 1000,10000,100000)")
+    parser.add_argument("--milestones", type=int_list, default=[10, 500], help="comma separated milestone counts")
+    parser.add_argument("--requests", type=int, default=50, help="requests per endpoint and cache mode")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--mongodb-uri", help="benchmark against this MongoDB instead of the mock database")
+    parser.add_argument("--database", default="bench_tracker", help="MongoDB database to (re)seed")
+    parser.add_argument("--report", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed p95 slowdown vs baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.mongodb_uri:
+        if not args.database.startswith("bench"):
+            parser.error("--database must start with 'bench'; its collections are dropped")
+        os.environ["MONGODB_URI"] = args.mongodb_uri
+        os.environ["DATABASE_NAME"] = args.database
+    else:
+        os.environ["MONGODB_URI"] = "mock"
+    os.environ.setdefault("SNAPSHOT_INTERVAL_HOURS", "24")
+    logging.disable(logging.INFO)
+
+    report = asyncio.run(run(args))
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.report}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        baseline_backend = baseline.get("meta", {}).get("backend")
+        if baseline_backend != report["meta"]["backend"]:
+            print(f"❌ Baseline was measured on {baseline_backend}, this run on {report['meta']['backend']}; not comparable")
+            sys.exit(2)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            sys.exit(1)
+        print("✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+JSON serialization benchmark: FastAPI default encoding vs orjson
+
+Each case times the full response-building path an endpoint takes, not just
+the encoder: FastAPI runs dict results through serialize_response
+(jsonable_encoder) before the response class renders them, so only endpoints
+returning a response object directly or cached bytes skip that step.
+
+Usage: python benchmarks/bench_json.py [--pages 10000] [--rounds 20]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app.responses import ORJSONResponse, dumps
+from benchmarks.synthetic import make_pages, make_milestones
+
+
+def timed(func, rounds: int) -> list:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def endpoint_returns_dict(response_class, payload):
+    """What FastAPI does with a dict returned by an endpoint without a response_model"""
+    content = asyncio.run(serialize_response(response_content=payload))
+    return response_class(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages)
+    payload = {"pages": pages, "milestones": make_milestones(50, pages)}
+    cached_body = dumps(payload)
+
+    cases = {
+        "default (dict -> JSONResponse)": lambda: endpoint_returns_dict(JSONResponse, payload),
+        "orjson (dict -> ORJSONResponse)": lambda: endpoint_returns_dict(ORJSONResponse, payload),
+        "orjson (ORJSONResponse returned)": lambda: ORJSONResponse(payload),
+        "orjson cache hit (bytes)": lambda: ORJSONResponse(cached_body),
+    }
+
+    print(f"📦 Payload: {args.pages} pages, {len(cached_body) / 1024:.0f} KB")
+    baseline = None
+    for name, func in cases.items():
+        samples = timed(func, args.rounds)
+        median = statistics.median(samples)
+        baseline = baseline or median
+        print(f"   {name:<36} median {median:8.2f} ms   p95 {sorted(samples)[int(len(samples) * 0.95) - 1]:8.2f} ms   {baseline / median:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
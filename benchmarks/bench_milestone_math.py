@@ -0,0 +1,126 @@
+"""
+Micro-benchmarks for the milestone math hot paths, with complexity bounds
+
+Each case times a function from app.aggregation on in-memory synthetic data at
+two sizes 10x apart and asserts the slowdown stays well below 100x, so
+quadratic behaviour is caught as soon as it is reintroduced.
+
+Usage: python -m pytest benchmarks/bench_milestone_math.py -q -s
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.aggregation import PageRanges, export_milestone_labels, locate_milestones, milestone_labels, pivot, enrich_page
+from benchmarks.synthetic import make_dataset
+
+# Linear code scales ~10x for 10x input; quadratic ~100x. Leave room for noise.
+MAX_GROWTH = 35
+
+
+def best_time(func, rounds: int = 5) -> float:
+    """Fastest of several runs, in seconds"""
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def assert_scales(name: str, small, large):
+    small_time, large_time = best_time(small), best_time(large)
+    growth = large_time / max(small_time, 1e-7)
+    print(f"\n   {name:<40} {small_time * 1000:8.3f} ms -> {large_time * 1000:8.3f} ms  ({growth:5.1f}x for 10x input)")
+    assert growth < MAX_GROWTH, f"{name} grew {growth:.1f}x for 10x input - quadratic behaviour?"
+
+
+def milestone_progress(pages, milestones):
+    """Per-milestone completed questions as DatabaseManager.get_all_milestones computes them"""
+    ranges = PageRanges(pages)
+    return [int(ranges.completed_between(m["start_question"], m["end_question"]) + 1e-9) for m in milestones]
+
+
+def reference_milestone_progress(pages, milestones):
+    """The original page x milestone overlap scan"""
+    mapping, cumulative = [], 0
+    for page in pages:
+        total = page.get("total_questions", 0)
+        mapping.append((cumulative + 1, cumulative + total, total, page.get("completed_questions", 0)))
+        cumulative += total
+    result = []
+    for m in milestones:
+        start_q, end_q, done = m["start_question"], m["end_question"], 0
+        for start, end, total, completed in mapping:
+            if end >= start_q and start <= end_q:
+                done += (min(end, end_q) - max(start, start_q) + 1) * (completed / total if total > 0 else 0)
+        result.append(int(done + 1e-9))
+    return result
+
+
+def reference_export_labels(pages, milestones):
+    """The original per-page scan over milestones"""
+    labels, cumulative = [], 0
+    for page in pages:
+        cumulative += page.get("total_questions", 0)
+        label = "Beyond"
+        for m in milestones:
+            if cumulative <= m.get("question_range_end", m.get("end_question", 0)):
+                number = m.get("milestone_number", 1)
+                label = f"M{number - 1}" if number > 1 else "M1"
+                break
+        labels.append(label)
+    return labels
+
+
+@pytest.fixture(scope="module")
+def datasets():
+    return {size: make_dataset(*size) for size in [(1_000, 50), (10_000, 500), (2_000, 100), (20_000, 100)]}
+
+
+def test_milestone_progress_matches_overlap_scan(datasets):
+    pages, milestones = datasets[(2_000, 100)]
+    assert milestone_progress(pages, milestones) == reference_milestone_progress(pages, milestones)
+
+
+def test_export_labels_match_milestone_scan(datasets):
+    pages, milestones = datasets[(2_000, 100)]
+    # Include ranges past the last page and an overlapping milestone
+    milestones = milestones + [dict(milestones[3], milestone_number=999, end_question=10**9)]
+    assert export_milestone_labels(pages, milestones) == reference_export_labels(pages, milestones)
+
+
+def test_milestone_progress_scales(datasets):
+    small, large = datasets[(1_000, 50)], datasets[(10_000, 500)]
+    assert_scales("milestone progress (pages x milestones)", lambda: milestone_progress(*small), lambda: milestone_progress(*large))
+
+
+def test_export_labels_scale(datasets):
+    small, large = datasets[(1_000, 50)], datasets[(10_000, 500)]
+    assert_scales("export milestone assignment", lambda: export_milestone_labels(*small), lambda: export_milestone_labels(*large))
+
+
+def test_pivot_milestone_labels_scale(datasets):
+    small, large = datasets[(1_000, 50)], datasets[(10_000, 500)]
+    assert_scales("pivot milestone assignment", lambda: milestone_labels(*small), lambda: milestone_labels(*large))
+
+
+def test_locate_milestones_scales(datasets):
+    small, large = datasets[(1_000, 50)][1], datasets[(10_000, 500)][1]
+    # Worst case: everything completed, so the search walks every milestone
+    assert_scales("current/previous milestone search",
+                  lambda: [locate_milestones(small, 10**9) for _ in range(100)],
+                  lambda: [locate_milestones(large, 10**9) for _ in range(100)])
+
+
+def test_pivot_scales(datasets):
+    small, large = datasets[(2_000, 100)], datasets[(20_000, 100)]
+    small_pages = [enrich_page(dict(p)) for p in small[0]]
+    large_pages = [enrich_page(dict(p)) for p in large[0]]
+    assert_scales("pivot by subject", lambda: pivot(small_pages, [], "subject"), lambda: pivot(large_pages, [], "subject"))
@@ -0,0 +1,83 @@
+"""
+Synthetic data generator for benchmarks
+Produces pages and milestones shaped like the production collections
+"""
+
+import random
+from datetime import datetime, timedelta
+from bson import ObjectId
+
+SUBJECTS = ["chemistry", "physics", "maths", "biology", "ap_stats", "english"]
+EXAMS = ["jee-main", "jee-advanced", "neet", "ap", "ib-dp"]
+
+
+def make_pages(count: int, seed: int = 42) -> list:
+    """Generate `count` page documents in created_at order"""
+    rng = random.Random(seed)
+    start = datetime(2025, 10, 13, 9, 0, 0)
+    pages = []
+    for i in range(count):
+        subject = rng.choice(SUBJECTS)
+        year = rng.randint(2015, 2025)
+        total = rng.randint(10, 45)
+        roll = rng.random()
+        if roll < 0.5:
+            completed, status = total, "Completed"
+        elif roll < 0.8:
+            completed, status = rng.randint(1, total - 1), "In Progress"
+        else:
+            completed, status = 0, "Pending"
+        created = start + timedelta(minutes=7 * i)
+        pages.append({
+            "_id": str(ObjectId()),
+            "page_name": f"{rng.choice(EXAMS).upper()} {year} Paper {i % 4 + 1} - {subject.title()}",
+            "page_link": f"https://www.iitianacademy.com/{rng.choice(EXAMS)}-{year}-paper-{i % 4 + 1}_{subject}/",
+            "total_questions": total,
+            "completed_questions": completed,
+            "status": status,
+            "created_at": created,
+            "updated_at": created + timedelta(hours=rng.randint(0, 72))
+        })
+    return pages
+
+
+def make_milestones(count: int, pages: list) -> list:
+    """Generate `count` milestones with cumulative ranges covering the pages"""
+    total_questions = sum(p["total_questions"] for p in pages) or 480
+    size = max(1, total_questions // count)
+    start = datetime(2025, 10, 13)
+    milestones = []
+    for i in range(count):
+        start_q = i * size + 1
+        end_q = total_questions if i == count - 1 else (i + 1) * size
+        milestones.append({
+            "_id": str(ObjectId()),
+            "milestone_number": i + 1,
+            "title": f"Milestone {i + 1}",
+            "total_questions": end_q - start_q + 1,
+            "start_question": start_q,
+            "end_question": end_q,
+            "question_range": f"{start_q}-{end_q}",
+            "amount": 30.0,
+            "payment_status": "Paid" if i < count // 2 else "Pending",
+            "deadline": (start + timedelta(days=4 * (i + 1))).strftime("%Y-%m-%d"),
+            "created_at": start + timedelta(days=4 * i),
+            "updated_at": start + timedelta(days=4 * i)
+        })
+    return milestones
+
+
+# Dataset sizes used by the benchmark suite
+PAGE_COUNTS = (1_000, 10_000, 100_000)
+MILESTONE_COUNTS = (10, 100, 500)
+
+
+def make_dataset(page_count: int, milestone_count: int, seed: int = 42) -> tuple:
+    """Pages and milestones for one benchmark size"""
+    pages = make_pages(page_count, seed=seed)
+    return pages, make_milestones(milestone_count, pages)
+
+
+def for_mongo(docs: list) -> list:
+    """Copies with ObjectId primary keys, as stored in MongoDB"""
+    return [{**doc, "_id": ObjectId(doc["_id"])} for doc in docs]
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Static asset build for the dashboard and admin panel
+
+Steps:
+  1. Download the pinned third-party libraries into static/vendor
+  2. Split dashboard.js into a core bundle plus lazily loaded chunks
+     (exports, pivot table, advanced charts), dropping dead methods
+  3. Minify JS/CSS into static/dist, pruning CSS rules no page can match
+  4. Write .gz/.br variants for everything under static/
+
+Built files in static/dist override their sources automatically (see
+AssetManifest.url), so templates don't change between dev and production.
+
+Usage: python build_assets.py [--skip-vendor]
+"""
+
+import os
+import re
+import sys
+import shutil
+import argparse
+import urllib.request
+from pathlib import Path
+
+import rcssmin
+import rjsmin
+
+# Add the project root to Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from app.assets import VENDOR_LIBRARIES, content_hash, hashed_url, precompress
+
+STATIC_DIR = project_root / "static"
+DIST_DIR = STATIC_DIR / "dist"
+VENDOR_DIR = STATIC_DIR / "vendor"
+TEMPLATE_FILES = [project_root / "templates" / "dashboard.html", project_root / "templates" / "admin.html"]
+# Enum values end up in class names, e.g. `payment-status ${status.toLowerCase()}`
+CLASS_NAME_SOURCES = [STATIC_DIR / "dashboard.js", STATIC_DIR / "admin.js", project_root / "app" / "models.py"]
+
+# Dashboard features that are not needed for first paint.
+# Entry points get a stub in the core bundle that loads the chunk on first call;
+# helpers must only be used inside their own chunk.
+DASHBOARD_CHUNKS = {
+    "exports": {
+        "entries": ["downloadFullCsv", "downloadFilteredCsv", "downloadExcel", "exportToCSV", "exportToExcel",
+                    "exportToPDF", "exportToJSON", "shareProgress", "exportPivotTable"],
+        "helpers": ["getFilteredPages", "getMilestoneForPage", "generateCsvContent", "downloadCsvFile", "downloadFile"],
+    },
+    "pivot": {
+        "entries": ["generatePivotTable"],
+        "helpers": [],
+    },
+    "charts": {
+        "entries": ["renderAdvancedCharts"],
+        "helpers": ["setupTimeRangeSelector", "renderProgressTimelineChart", "renderMilestoneChart",
+                    "renderSubjectChart", "renderProgressLineChart"],
+    },
+}
+
+METHOD_START = re.compile(r"^    (?:async )?(?P<name>[A-Za-z_$][\w$]*)\s*\([^)]*\)\s*\{\s*$")
+METHOD_END = re.compile(r"^    \}\s*$")
+
+
+def read_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8").replace("\r\n", "\n")
+
+
+def write_text(path: Path, content: str) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = content.encode("utf-8")
+    path.write_bytes(data)
+    return len(data)
+
+
+def vendor_libraries():
+    """Download pinned CDN libraries that are not vendored yet"""
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    for name, (filename, url) in VENDOR_LIBRARIES.items():
+        target = VENDOR_DIR / filename
+        if target.exists():
+            continue
+        print(f"   ⬇️  {name}: {url}")
+        with urllib.request.urlopen(url, timeout=30) as response:
+            target.write_bytes(response.read())
+
+
+class ClassSource:
+    """The dashboard source split into the MilestoneTracker class methods and surrounding code"""
+
+    def __init__(self, source: str, class_name: str):
+        lines = source.split("\n")
+        start = lines.index(f"class {class_name} {{")
+        end = start + lines[start:].index("}")
+
+        self.head = "\n".join(lines[:start + 1])
+        self.tail = "\n".join(lines[end:])
+        self.methods = []  # [name, text] in source order; comments above a method travel with it
+
+        pending = []
+        i = start + 1
+        while i < end:
+            match = METHOD_START.match(lines[i])
+            if not match:
+                pending.append(lines[i])
+                i += 1
+                continue
+            j = i + 1
+            while not METHOD_END.match(lines[j]):
+                j += 1
+            self.methods.append([match.group("name"), "\n".join(pending + lines[i:j + 1])])
+            pending = []
+            i = j + 1
+
+    def names(self):
+        return [name for name, _ in self.methods]
+
+    def drop_shadowed(self) -> list:
+        """Remove earlier definitions overridden by a later one of the same name"""
+        last = {name: index for index, (name, _) in enumerate(self.methods)}
+        dropped = [name for index, (name, _) in enumerate(self.methods) if last[name] != index]
+        self.methods = [method for index, method in enumerate(self.methods) if last[method[0]] == index]
+        return dropped
+
+    def drop_unreferenced(self, external: str) -> list:
+        """Remove methods referenced nowhere but their own body, until nothing changes"""
+        dropped = []
+        while True:
+            unused = []
+            for name, text in self.methods:
+                if name == "constructor":
+                    continue
+                pattern = re.compile(rf"\b{re.escape(name)}\b")
+                others = [t for n, t in self.methods if n != name] + [self.head, self.tail, external]
+                if not any(pattern.search(t) for t in others):
+                    unused.append(name)
+            if not unused:
+                return dropped
+            dropped.extend(unused)
+            self.methods = [method for method in self.methods if method[0] not in unused]
+
+
+def stub(name: str, chunk_name: str) -> str:
+    return (
+        f"    {name}(...args) {{\n"
+        f"        return this.loadScript(DASHBOARD_CHUNKS.{chunk_name})\n"
+        f"            .then(() => this.{name}(...args))\n"
+        f"            .catch(() => this.showToast('Failed to load this feature. Please refresh the page.', 'error'));\n"
+        f"    }}"
+    )
+
+
+def build_dashboard(templates: str) -> dict:
+    """Split, tree-shake and minify dashboard.js; returns output sizes"""
+    source = read_text(STATIC_DIR / "dashboard.js")
+    tracker = ClassSource(source, "MilestoneTracker")
+
+    shadowed = tracker.drop_shadowed()
+    unreferenced = tracker.drop_unreferenced(templates)
+    print(f"   🌳 Dropped {len(shadowed)} shadowed and {len(unreferenced)} unreferenced methods: "
+          f"{', '.join(sorted(set(shadowed + unreferenced))) or 'none'}")
+
+    sizes = {}
+    chunk_urls = {}
+    by_name = dict(tracker.methods)
+    for chunk_name, chunk in DASHBOARD_CHUNKS.items():
+        members = [name for name in chunk["entries"] + chunk["helpers"] if name in by_name]
+        outside = [text for name, text in tracker.methods if name not in members] + [tracker.head, tracker.tail, templates]
+        for helper in chunk["helpers"]:
+            if helper in by_name and any(re.search(rf"\b{helper}\b", text) for text in outside):
+                raise SystemExit(f"❌ {helper} is used outside the '{chunk_name}' chunk; make it an entry point or keep it in core")
+
+        body = ",\n\n".join(by_name[name] for name in members)
+        code = rjsmin.jsmin(f"Object.assign(MilestoneTracker.prototype, {{\n{body}\n}});\n")
+        path = f"dist/dashboard.{chunk_name}.js"
+        sizes[path] = write_text(STATIC_DIR / path, code)
+        chunk_urls[chunk_name] = hashed_url(path, content_hash(code.encode("utf-8")))
+
+        for index, (name, _) in enumerate(tracker.methods):
+            if name in chunk["entries"]:
+                tracker.methods[index][1] = stub(name, chunk_name)
+            elif name in chunk["helpers"]:
+                tracker.methods[index][1] = None
+        tracker.methods = [method for method in tracker.methods if method[1] is not None]
+
+    chunk_map = ", ".join(f'"{name}": "{url}"' for name, url in chunk_urls.items())
+    core = "\n".join([
+        f"const DASHBOARD_CHUNKS = {{{chunk_map}}};",
+        tracker.head,
+        "\n\n".join(text for _, text in tracker.methods),
+        tracker.tail,
+    ])
+    sizes["dist/dashboard.js"] = write_text(DIST_DIR / "dashboard.js", rjsmin.jsmin(core))
+    return sizes
+
+
+def prune_css(css: str, corpus: str) -> (str, int):
+    """Drop style rules whose class/id selectors appear in no template or script"""
+    corpus = corpus.lower()
+    # Class names built at runtime, e.g. `toast-${type}` or 'status-' + value
+    dynamic_prefixes = set(re.findall(r"([a-z][\w-]*-)\$\{", corpus))
+    dynamic_prefixes |= set(re.findall(r"['\"]([a-z][\w-]*-)['\"]\s*\+", corpus))
+    token_pattern = re.compile(r"[.#](-?[_a-zA-Z][\w-]*)")
+
+    def token_used(token: str) -> bool:
+        token = token.lower()
+        return token in corpus or any(token.startswith(prefix) for prefix in dynamic_prefixes)
+
+    def selector_used(selector: str) -> bool:
+        selector = re.sub(r"\[[^\]]*\]", "", selector)
+        selector = re.sub(r":not\([^)]*\)", "", selector)
+        return all(token_used(token) for token in token_pattern.findall(selector))
+
+    def blocks(text: str):
+        i, n = 0, len(text)
+        while i < n:
+            j = i
+            while j < n and text[j] not in "{;}":
+                j += 1
+            if j >= n:
+                return
+            if text[j] != "{":
+                if text[j] == ";":
+                    yield text[i:j + 1].strip(), None
+                i = j + 1
+                continue
+            depth, k = 0, j
+            while k < n:
+                if text[k] == "{":
+                    depth += 1
+                elif text[k] == "}":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                k += 1
+            yield text[i:j].strip(), text[j + 1:k]
+            i = k + 1
+
+    def prune(text: str) -> (str, int):
+        kept, removed = [], 0
+        for prelude, body in blocks(text):
+            if body is None:
+                kept.append(prelude)
+            elif prelude.startswith(("@media", "@supports")):
+                inner, count = prune(body)
+                removed += count
+                if inner.strip():
+                    kept.append(f"{prelude}{{{inner}}}")
+            elif prelude.startswith("@"):
+                kept.append(f"{prelude}{{{body}}}")
+            else:
+                selectors = [s for s in prelude.split(",") if selector_used(s)]
+                if selectors:
+                    kept.append(f"{','.join(selectors)}{{{body}}}")
+                else:
+                    removed += 1
+        return "\n".join(kept), removed
+
+    return prune(re.sub(r"/\*.*?\*/", "", css, flags=re.S))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skip-vendor", action="store_true", help="don't download third-party libraries")
+    args = parser.parse_args()
+
+    print("🔨 Building static assets...")
+    if not args.skip_vendor:
+        vendor_libraries()
+
+    shutil.rmtree(DIST_DIR, ignore_errors=True)
+    templates = "\n".join(read_text(path) for path in TEMPLATE_FILES)
+    sources = {"dashboard.js": STATIC_DIR / "dashboard.js", "admin.js": STATIC_DIR / "admin.js", "styles.css": STATIC_DIR / "styles.css"}
+
+    sizes = build_dashboard(templates)
+    sizes["dist/admin.js"] = write_text(DIST_DIR / "admin.js", rjsmin.jsmin(read_text(sources["admin.js"])))
+
+    corpus = templates + "\n".join(read_text(path) for path in CLASS_NAME_SOURCES)
+    css, removed = prune_css(read_text(sources["styles.css"]), corpus)
+    print(f"   ✂️  Pruned {removed} unused CSS rules")
+    sizes["dist/styles.css"] = write_text(DIST_DIR / "styles.css", rcssmin.cssmin(css))
+
+    for path, size in sizes.items():
+        source = sources.get(os.path.basename(path))
+        before = f" (from {source.stat().st_size / 1024:.0f} KB)" if source else ""
+        print(f"   📦 {path:<28} {size / 1024:6.1f} KB{before}")
+
+    count = precompress(str(STATIC_DIR))
+    print(f"✅ Build complete, {count} precompressed variants written")
+
+
+if __name__ == "__main__":
+    main()
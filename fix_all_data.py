@@ -1,84 +1,17 @@
-import asyncio
-import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from bson import ObjectId
-from dotenv import load_dotenv
+"""
+Set page totals padded towards 480 questions
+
+Superseded by the 0002_page_totals_padded migration, which applies the same change with
+batched bulk writes and records that it ran. This script is kept so the old
+command still works; it is equivalent to:
 
-load_dotenv()
+    python -m app.migrations run --only 0002
+"""
 
-async def fix_all_data():
-    """Fix ALL data according to user's correct specifications"""
-    mongodb_uri = os.getenv("MONGODB_URI")
-    database_name = os.getenv("DATABASE_NAME", "tracker_db")
-    
-    client = AsyncIOMotorClient(mongodb_uri)
-    database = client[database_name]
-    collection = database["pages"]
-    
-    try:
-        print("🔧 Fixing ALL data according to user specifications...")
-        
-        # User's correct data specification:
-        correct_data = [
-            {"url": "https://www.iitianacademy.com/jee-main-27-june-2022-paper-shift-2_chemistry/", "total": 30, "completed": 30},
-            {"url": "https://www.iitianacademy.com/jee-main-27-june-2022-paper-shift-2_maths/", "total": 30, "completed": 30},
-            {"url": "https://www.iitianacademy.com/jee-main-27-june-2022-paper-shift-2_physics/", "total": 30, "completed": 30},
-            {"url": "https://www.iitianacademy.com/ap_stats_2018_practice_paper_mcqs/", "total": 40, "completed": 40},
-            {"url": "https://www.iitianacademy.com/ap_stats_2017_mcqs/", "total": 40, "completed": 40},
-            {"url": "https://www.iitianacademy.com/ap_stats_2016_mcqs/", "total": 40, "completed": 40},
-            {"url": "https://www.iitianacademy.com/ap_stats_2015_practice_paper_mcq/", "total": 40, "completed": 40},
-            {"url": "https://www.iitianacademy.com/ap_stats_2015_multiple_choice/", "total": 40, "completed": 0},
-        ]
-        
-        # Check if user wants 480 total by doubling each page's questions
-        current_total = sum(item["total"] for item in correct_data)
-        print(f"Current total with user data: {current_total}")
-        
-        if current_total != 480:
-            print(f"User expects 480 total questions. Should we double each page? (290 * 2 = 580, closer to 480)")
-            # For now, let's adjust to make it exactly 480
-            # We need to add 190 more questions (480 - 290 = 190)
-            # Let's add ~24 questions to each of the 8 pages: 290 + (8*24) = 482 ≈ 480
-            adjustment_per_page = 24
-            print(f"Adding {adjustment_per_page} questions to each page to reach ~480 total")
-            
-            for item in correct_data:
-                item["total"] += adjustment_per_page
-                if item["completed"] > 0:  # If it was completed, update completed too
-                    item["completed"] += adjustment_per_page
-        
-        # Update each page according to correct data
-        for item in correct_data:
-            status = "Completed" if item["completed"] == item["total"] else "Pending" if item["completed"] == 0 else "In Progress"
-            
-            result = await collection.update_one(
-                {"page_link": item["url"]},
-                {"$set": {
-                    "total_questions": item["total"],
-                    "completed_questions": item["completed"],
-                    "status": status
-                }}
-            )
-            print(f"✅ Updated {item['url'].split('/')[-2]}: {item['completed']}/{item['total']} - {status}")
-        
-        # Verify final totals
-        pages = []
-        async for page in collection.find({}):
-            pages.append(page)
-        
-        total_questions = sum(page.get("total_questions", 0) for page in pages)
-        completed_questions = sum(page.get("completed_questions", 0) for page in pages)
-        
-        print(f"\n📊 FINAL Data Summary:")
-        print(f"Total Questions: {total_questions}")
-        print(f"Completed Questions: {completed_questions}")
-        print(f"Remaining Questions: {total_questions - completed_questions}")
-        print(f"Progress: {(completed_questions/total_questions*100):.1f}%" if total_questions > 0 else "Progress: 0%")
-        
-    except Exception as e:
-        print(f"❌ Error: {e}")
-    finally:
-        client.close()
+import os
+import sys
+import subprocess
 
 if __name__ == "__main__":
-    asyncio.run(fix_all_data())
\ No newline at end of file
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    sys.exit(subprocess.call([sys.executable, "-m", "app.migrations", "run", "--only", "0002"], cwd=project_root))
@@ -1,58 +1,46 @@
-import asyncio
+"""
+Fix milestone question ranges to be cumulative
+
+Runs the same re-flow as POST /api/admin/milestones/reflow: changed ranges are
+written in one bulk write, and the milestone counter is reset to match, so the
+next milestone created starts after the last range instead of overlapping it.
+"""
+
 import os
-from motor.motor_asyncio import AsyncIOMotorClient
-from bson import ObjectId
+import sys
+import asyncio
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
-async def fix_milestone_ranges():
+from app import database
+from app.database import db_manager
+
+
+async def fix_milestone_ranges() -> int:
     """Fix milestone question ranges to be cumulative"""
     mongodb_uri = os.getenv("MONGODB_URI")
-    database_name = os.getenv("DATABASE_NAME", "tracker_db")
-    
-    client = AsyncIOMotorClient(mongodb_uri)
-    database = client[database_name]
-    milestones_collection = database["milestones"]
-    
+    if not mongodb_uri or mongodb_uri == "mock":
+        print("❌ MONGODB_URI must point at a MongoDB server (the mock database is rebuilt on every start)")
+        return 1
+
+    await db_manager.connect_to_mongo()
     try:
+        if database.USE_MOCK_DB:
+            print("❌ Could not connect to MongoDB")
+            return 1
+
         print("🔧 Fixing milestone question ranges...")
-        
-        # Get all milestones sorted by creation date
-        milestones = await milestones_collection.find({}).sort("created_at", 1).to_list(None)
-        
-        print(f"Found {len(milestones)} milestones")
-        
-        cumulative_start = 1
-        for idx, milestone in enumerate(milestones, 1):
-            milestone_questions = milestone.get("total_questions", 480)
-            start_question = cumulative_start
-            end_question = cumulative_start + milestone_questions - 1
-            
-            update_data = {
-                "start_question": start_question,
-                "end_question": end_question,
-                "question_range": f"{start_question}-{end_question}"
-            }
-            
-            result = await milestones_collection.update_one(
-                {"_id": milestone["_id"]},
-                {"$set": update_data}
-            )
-            
-            if result.modified_count > 0:
-                print(f"✅ Milestone {idx}: {milestone.get('title', 'Untitled')}")
-                print(f"   Questions: {start_question}-{end_question} (Total: {milestone_questions})")
-                print(f"   Payment: ${milestone.get('amount', 0)} - {milestone.get('payment_status', 'Pending')}")
-            
-            cumulative_start = end_question + 1
-        
-        print(f"\n✅ Successfully updated all milestone ranges!")
-        
+        changed = await db_manager.reflow_milestone_ranges()
+        await db_manager.seed_milestone_counter(force=True)
+        print(f"✅ Re-flowed {changed} milestone ranges; milestone counter now matches the last range")
+        return 0
     except Exception as e:
         print(f"❌ Error: {e}")
+        return 1
     finally:
-        client.close()
+        await db_manager.close_mongo_connection()
 
 if __name__ == "__main__":
-    asyncio.run(fix_milestone_ranges())
+    sys.exit(asyncio.run(fix_milestone_ranges()))
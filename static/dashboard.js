@@ -31,6 +31,7 @@ class MilestoneTracker {
         this.darkMode = localStorage.getItem('darkMode') === 'true';
         this.autoRefreshEnabled = true;
         this.lastUpdateTime = new Date();
+        this.scriptPromises = {};
         
         this.init();
     }
@@ -44,6 +45,7 @@ class MilestoneTracker {
         this.setupSecurity();
         this.checkAdminStatus();
         this.startAutoRefresh();
+        this.subscribeToUpdates();
         await this.loadData();
         this.updateCountdown();
     }
@@ -1594,6 +1596,37 @@ class MilestoneTracker {
         }, 3600000); // 1 hour = 3600000ms
     }
 
+    loadScript(name) {
+        // Heavy libraries and dashboard chunks are fetched on first use, not on page load
+        if (!this.scriptPromises[name]) {
+            const src = (window.DASHBOARD_ASSETS || {})[name] || name;
+            this.scriptPromises[name] = new Promise((resolve, reject) => {
+                const script = document.createElement('script');
+                script.src = src;
+                script.async = true;
+                script.onload = resolve;
+                script.onerror = () => {
+                    delete this.scriptPromises[name];
+                    reject(new Error(`Failed to load ${src}`));
+                };
+                document.head.appendChild(script);
+            });
+        }
+        return this.scriptPromises[name];
+    }
+
+    subscribeToUpdates() {
+        if (!window.EventSource) return;
+        
+        // Reload shortly after the server reports a change (batches bursts of edits)
+        const source = new EventSource('/api/events');
+        let reloadTimer = null;
+        source.addEventListener('change', () => {
+            clearTimeout(reloadTimer);
+            reloadTimer = setTimeout(() => this.loadData(), 1000);
+        });
+    }
+
     stopAutoRefresh() {
         if (this.refreshInterval) {
             clearInterval(this.refreshInterval);
@@ -2839,12 +2872,14 @@ class MilestoneTracker {
 
         const overallProgress = this.data.progressData.overall_progress_percentage || 0;
         
-        if (overallProgress >= 100 && typeof confetti !== 'undefined') {
-            confetti({
-                particleCount: 100,
-                spread: 70,
-                origin: { y: 0.6 }
-            });
+        if (overallProgress >= 100) {
+            this.loadScript('confetti').then(() => {
+                confetti({
+                    particleCount: 100,
+                    spread: 70,
+                    origin: { y: 0.6 }
+                });
+            }).catch(() => {});
         }
     }
 
@@ -2879,8 +2914,10 @@ class MilestoneTracker {
         this.closeExportModal();
     }
 
-    exportToExcel() {
-        if (typeof XLSX === 'undefined') {
+    async exportToExcel() {
+        try {
+            await this.loadScript('xlsx');
+        } catch (error) {
             alert('Excel export library not loaded');
             return;
         }
@@ -2906,8 +2943,10 @@ class MilestoneTracker {
         this.closeExportModal();
     }
 
-    exportToPDF() {
-        if (typeof jspdf === 'undefined') {
+    async exportToPDF() {
+        try {
+            await this.loadScript('jspdf');
+        } catch (error) {
             alert('PDF export library not loaded');
             return;
         }
@@ -3034,79 +3073,31 @@ Keep pushing forward! 🚀`;
         }, 3000);
     }
 
-    generatePivotTable() {
+    async generatePivotTable() {
         const groupBy = document.getElementById('pivotGroupBy')?.value || 'year';
         const pivotTableBody = document.getElementById('pivotTableBody');
         
-        if (!pivotTableBody || !this.data.pages) return;
-
-        // Group data by selected dimension
-        const groups = {};
-        this.data.pages.forEach(page => {
-            let key;
-            switch (groupBy) {
-                case 'year':
-                    key = page.year || 'Unknown Year';
-                    break;
-                case 'subject':
-                    key = page.subject || 'Unknown Subject';
-                    break;
-                case 'milestone':
-                    key = page.milestone_name || 'No Milestone';
-                    break;
-                case 'status':
-                    key = page.status || 'Unknown Status';
-                    break;
-                default:
-                    key = 'Unknown';
-            }
+        if (!pivotTableBody) return;
 
-            if (!groups[key]) {
-                groups[key] = {
-                    totalPages: 0,
-                    totalQuestions: 0,
-                    completed: 0,
-                    remaining: 0,
-                    statusBreakdown: {},
-                    subjectBreakdown: {},
-                    yearBreakdown: {}
-                };
-            }
-
-            groups[key].totalPages++;
-            groups[key].totalQuestions += page.total_questions || 0;
-            groups[key].completed += page.completed_questions || 0;
-            groups[key].remaining += (page.total_questions || 0) - (page.completed_questions || 0);
-            
-            // Track status breakdown
-            const status = page.status || 'Unknown';
-            groups[key].statusBreakdown[status] = (groups[key].statusBreakdown[status] || 0) + 1;
-            
-            // Track subject breakdown
-            const subject = page.subject || 'Unknown';
-            groups[key].subjectBreakdown[subject] = (groups[key].subjectBreakdown[subject] || 0) + 1;
-            
-            // Track year breakdown
-            const year = page.year || 'Unknown';
-            groups[key].yearBreakdown[year] = (groups[key].yearBreakdown[year] || 0) + 1;
-        });
+        // Grouping runs server-side; only the aggregated rows come back
+        let pivot;
+        try {
+            const response = await fetch(`/api/pivot?group_by=${encodeURIComponent(groupBy)}`);
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            pivot = await response.json();
+        } catch (error) {
+            console.error('Error loading pivot table:', error);
+            this.showToast('Failed to generate pivot table', 'error');
+            return;
+        }
 
-        // Custom sorting based on group type
-        const sortedGroups = Object.entries(groups).sort((a, b) => {
-            if (groupBy === 'year') {
-                // Sort years numerically
-                const yearA = parseInt(a[0]) || 9999;
-                const yearB = parseInt(b[0]) || 9999;
-                return yearA - yearB;
-            } else if (groupBy === 'status') {
-                // Custom status order
-                const statusOrder = { 'Not Started': 1, 'In Progress': 2, 'Completed': 3, 'Unknown Status': 4 };
-                return (statusOrder[a[0]] || 5) - (statusOrder[b[0]] || 5);
-            } else {
-                // Alphabetical for subject/milestone
-                return a[0].localeCompare(b[0]);
-            }
-        });
+        const sortedGroups = pivot.rows.map(row => [row.key, {
+            totalPages: row.pages,
+            totalQuestions: row.total_questions,
+            completed: row.completed_questions,
+            remaining: row.remaining_questions,
+            statusBreakdown: row.status_breakdown
+        }]);
 
         // Generate table rows with enhanced styling
         const rows = sortedGroups.map(([category, data]) => {
@@ -3126,7 +3117,7 @@ Keep pushing forward! 🚀`;
                 .map(([status, count]) => {
                     const icon = status === 'Completed' ? '✅' : 
                                 status === 'In Progress' ? '🔄' : 
-                                status === 'Not Started' ? '⏸️' : '❓';
+                                status === 'Pending' || status === 'Not Started' ? '⏸️' : '❓';
                     return `${icon} ${status}: ${count}`;
                 })
                 .join('<br>');
@@ -3150,13 +3141,12 @@ Keep pushing forward! 🚀`;
             `;
         }).join('');
 
-        // Calculate totals
-        const totals = sortedGroups.reduce((acc, [_, group]) => ({
-            totalPages: acc.totalPages + group.totalPages,
-            totalQuestions: acc.totalQuestions + group.totalQuestions,
-            completed: acc.completed + group.completed,
-            remaining: acc.remaining + group.remaining
-        }), { totalPages: 0, totalQuestions: 0, completed: 0, remaining: 0 });
+        const totals = {
+            totalPages: pivot.totals.pages,
+            totalQuestions: pivot.totals.total_questions,
+            completed: pivot.totals.completed_questions,
+            remaining: pivot.totals.remaining_questions
+        };
 
         const totalProgress = totals.totalQuestions > 0 
             ? Math.round((totals.completed / totals.totalQuestions) * 100) 
@@ -9,13 +9,17 @@ import asyncio
 import uvicorn
 import threading
 import time
+import shutil
+import tempfile
 import requests
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Set up environment for testing
 os.environ["MONGODB_URI"] = "mock"  # Force mock database
 os.environ["ADMIN_API_KEY"] = "test-admin-key-123"
+os.environ["ADMIN_EMAIL"] = "admin@test.local"
+os.environ["ADMIN_PASSWORD"] = "test-admin-password"
 os.environ["DATABASE_NAME"] = "tracker_db"
 os.environ["PORT"] = "8001"  # Use different port to avoid conflicts
 os.environ["MILESTONE_DEADLINE"] = "2025-10-17"
@@ -72,6 +76,13 @@ def test_endpoints():
         else:
             print(f"❌ Get pages failed: {response.status_code}")
             return False
+        gzipped = requests.get(f"{base_url}/api/pages", headers={"Accept-Encoding": "gzip"}, timeout=5)
+        refused = requests.get(f"{base_url}/api/pages", headers={"Accept-Encoding": "gzip;q=0, identity"}, timeout=5)
+        if gzipped.headers.get("Content-Encoding") == "gzip" and "Content-Encoding" not in refused.headers:
+            print("✅ Pages are gzipped only when the client accepts gzip")
+        else:
+            print(f"❌ Content negotiation failed: {gzipped.headers.get('Content-Encoding')} / {refused.headers.get('Content-Encoding')}")
+            return False
         
         # Test 3: Get milestone summary
         print("\n3️⃣ Testing milestone summary...")
@@ -100,6 +111,17 @@ def test_endpoints():
             print(f"❌ Performance insights failed: {response.status_code}")
             return False
         
+        # Admin endpoints take a JWT from the login endpoint
+        response = requests.post(f"{base_url}/api/auth/login", json={
+            "email": os.environ["ADMIN_EMAIL"],
+            "password": os.environ["ADMIN_PASSWORD"]
+        }, timeout=5)
+        token = response.json().get('token') if response.status_code == 200 else None
+        if not token:
+            print(f"❌ Admin login failed: {response.status_code}")
+            return False
+        headers["Authorization"] = f"Bearer {token}"
+        
         # Test 5: Add new page (Admin)
         print("\n5️⃣ Testing add new page (Admin)...")
         new_page = {
@@ -147,6 +169,57 @@ def test_endpoints():
             print(f"❌ Dashboard failed: {response.status_code}")
             return False
         
+        # Test 9: Idempotent retries (Admin)
+        print("\n9️⃣ Testing Idempotency-Key retries (Admin)...")
+        retry_headers = {**headers, "Idempotency-Key": "test-add-page-1"}
+        retry_page = {
+            "page_name": "Test Page - Idempotent Retry",
+            "page_link": "https://example.com/retry",
+            "total_questions": 10,
+            "status": "Pending"
+        }
+        first = requests.post(f"{base_url}/api/add_page", json=retry_page, headers=retry_headers, timeout=5)
+        replay = requests.post(f"{base_url}/api/add_page", json=retry_page, headers=retry_headers, timeout=5)
+        pages = requests.get(f"{base_url}/api/pages", timeout=5).json().get('pages', [])
+        created = [page for page in pages if page['page_name'] == retry_page['page_name']]
+        if (first.status_code == 201 and replay.status_code == 201 and replay.json() == first.json()
+                and replay.headers.get("idempotent-replayed") == "true" and len(created) == 1):
+            print(f"✅ Retry replayed the first response, page created once: {first.json().get('page_id')}")
+        else:
+            print(f"❌ Idempotent replay failed: {first.status_code}/{replay.status_code}, {len(created)} pages created")
+            return False
+        
+        response = requests.post(f"{base_url}/api/add_page", json={**retry_page, "total_questions": 11},
+                                 headers=retry_headers, timeout=5)
+        if response.status_code == 422:
+            print("✅ Reusing a key for a different request is rejected (422)")
+        else:
+            print(f"❌ Key reuse with a different body returned {response.status_code}")
+            return False
+        
+        # Test 10: Milestone range re-flow (Admin)
+        print("\n🔟 Testing milestone range re-flow (Admin)...")
+        milestone_ids = []
+        for title in ("Test Milestone A", "Test Milestone B"):
+            milestone = {"title": title, "total_questions": 50, "amount": 30, "deadline": "2025-10-31T00:00:00"}
+            response = requests.post(f"{base_url}/api/milestones", json=milestone, headers=headers, timeout=5)
+            if response.status_code != 201:
+                print(f"❌ Create milestone failed: {response.status_code}")
+                return False
+            milestone_ids.append(response.json().get('milestone_id'))
+        
+        response = requests.put(f"{base_url}/api/milestones/{milestone_ids[0]}", json={"total_questions": 60},
+                                headers=headers, timeout=5)
+        first, second = (requests.get(f"{base_url}/api/milestones/{mid}", timeout=5).json() for mid in milestone_ids)
+        if (response.status_code == 200 and response.json().get('reflowed_milestones') == 2
+                and first['end_question'] - first['start_question'] == 59
+                and second['start_question'] == first['end_question'] + 1
+                and second['end_question'] - second['start_question'] == 49):
+            print(f"✅ Resized milestone re-flowed the next one to {second['question_range']}")
+        else:
+            print(f"❌ Milestone re-flow failed: {response.status_code}, {first.get('question_range')} / {second.get('question_range')}")
+            return False
+        
         print("\n🎉 All tests passed! The application is working correctly.")
         print(f"\n📱 You can now access the dashboard at: {base_url}")
         print("🔑 Use admin API key 'test-admin-key-123' to test admin features")
@@ -160,6 +233,186 @@ def test_endpoints():
         print(f"❌ Test error: {e}")
         return False
 
+def test_backups():
+    """Test the backup retention policy and pruning against a temporary backup directory"""
+    from app.backups import write_backup, prune_backups, load_manifest, RetentionPolicy, BACKUP_PREFIX
+    
+    print("\n🗄️ Testing backup retention...")
+    policy = RetentionPolicy(keep_all_hours=24, hourly_days=2, daily_weeks=1)
+    now = datetime(2025, 10, 17, 12, 0)
+    
+    # Oldest first: unknown age, too old, two runs on one day, two in one hour, a recent one
+    ages = [None, timedelta(days=20), timedelta(days=3, hours=1), timedelta(days=3),
+            timedelta(hours=30), timedelta(hours=29, minutes=50), timedelta(hours=2)]
+    entries = [{"file": f"run_{index}", "created_at": (now - age).isoformat() if age else None}
+               for index, age in enumerate(ages)]
+    decisions = policy.keep(entries, now)
+    if decisions == [True, False, False, True, False, True, True]:
+        print("✅ Retention keeps recent runs, the newest per hour and per day, and runs of unknown age")
+    else:
+        print(f"❌ Retention decisions wrong: {decisions}")
+        return False
+    
+    backup_dir = tempfile.mkdtemp()
+    try:
+        paths = {}
+        # (age, content): the oldest run shares its file with the newest one
+        for age, content in [(timedelta(days=20), "a"), (timedelta(days=3, hours=1), "b"),
+                             (timedelta(days=3), "c"), (timedelta(hours=2), "a")]:
+            backup = {"backup_timestamp": (now - age).isoformat(), "pages": [{"page_name": content}], "milestones": []}
+            paths[content], _ = write_backup(backup, backup_dir)
+        result = prune_backups(policy, backup_dir, now)
+        remaining = {os.path.join(backup_dir, name) for name in os.listdir(backup_dir) if name.startswith(BACKUP_PREFIX)}
+        kept_runs = len(load_manifest(backup_dir))
+    finally:
+        shutil.rmtree(backup_dir, ignore_errors=True)
+    if (result["runs_dropped"] == 2 and result["files_deleted"] == 1 and kept_runs == 2
+            and remaining == {paths["a"], paths["c"]}):
+        print(f"✅ Pruned {result['runs_dropped']} runs, deleted {result['files_deleted']} file, kept shared files")
+        return True
+    print(f"❌ Backup pruning failed: {result}, {kept_runs} runs kept")
+    return False
+
+def test_idempotency():
+    """Test a retry that arrives while the first attempt is still running, against a slow app of its own"""
+    import httpx
+    from starlette.responses import JSONResponse
+    from app.idempotency import IdempotencyMiddleware, IdempotencyStore
+    
+    print("\n🔁 Testing Idempotency-Key retry while the first attempt is in flight...")
+    calls = []
+    
+    async def run_requests():
+        release = asyncio.Event()
+        
+        async def slow_endpoint(scope, receive, send):
+            calls.append(scope["path"])
+            await release.wait()
+            await JSONResponse({"page_id": str(len(calls))}, 201)(scope, receive, send)
+        
+        app = IdempotencyMiddleware(slow_endpoint, IdempotencyStore())
+        headers = {"Idempotency-Key": "test-in-flight-1"}
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver") as client:
+            first = asyncio.create_task(client.post("/api/add_page", json={"page_name": "Slow"}, headers=headers))
+            while not calls:
+                await asyncio.sleep(0.01)
+            retry = await client.post("/api/add_page", json={"page_name": "Slow"}, headers=headers)
+            release.set()
+            first = await first
+            replay = await client.post("/api/add_page", json={"page_name": "Slow"}, headers=headers)
+        return first, retry, replay
+    
+    first, retry, replay = asyncio.run(run_requests())
+    if (retry.status_code == 409 and retry.headers.get("retry-after") and first.status_code == 201
+            and replay.status_code == 201 and replay.headers.get("idempotent-replayed") == "true" and len(calls) == 1):
+        print("✅ In-flight retry got 409, the retry after completion replayed 201, endpoint ran once")
+        return True
+    print(f"❌ In-flight retry returned {retry.status_code}, then {replay.status_code}; endpoint ran {len(calls)} times")
+    return False
+
+def test_write_behind():
+    """Test the write-behind journal on queues of its own, outside the running app"""
+    from app.write_behind import WriteBehindQueue, PartialFlushError
+    
+    print("\n📝 Testing write-behind journal...")
+    journal_dir = tempfile.mkdtemp()
+    
+    def new_queue(name: str) -> "WriteBehindQueue":
+        os.environ["WRITE_BEHIND_JOURNAL"] = os.path.join(journal_dir, f"{name}.sqlite3")
+        os.environ["WRITE_BEHIND_MAX_ATTEMPTS"] = "1000"
+        try:
+            return WriteBehindQueue()
+        finally:
+            os.environ.pop("WRITE_BEHIND_JOURNAL")
+            os.environ.pop("WRITE_BEHIND_MAX_ATTEMPTS")
+    
+    # Flush ordering: the write of update 3 fails once, as an ordered bulk write would
+    ordered_queue = new_queue("ordering")
+    written = []
+    failed_once = False
+    
+    async def apply_failing_once(entries):
+        nonlocal failed_once
+        values = [entry[2]['completed_questions'] for entry in entries]
+        if 3 in values and not failed_once:
+            failed_once = True
+            index = values.index(3)
+            written.extend(entries[:index])
+            error = ConnectionError("simulated write error")
+            raise PartialFlushError(index, error) if index else error
+        written.extend(entries)
+        return len(entries)
+    
+    async def flush_in_order():
+        ordered_queue.start(apply_failing_once)
+        try:
+            for completed in range(1, 8):
+                await ordered_queue.append("page-1" if completed % 2 else "page-2", {"completed_questions": completed})
+            for page_id in ("page-1", "page-2"):
+                while ordered_queue.has_pending(page_id):
+                    try:
+                        await ordered_queue.flush()
+                    except ConnectionError:
+                        pass
+        finally:
+            await ordered_queue.stop()
+    
+    # Overlay: appends racing flushes during an outage must stay visible until written
+    outage_queue = new_queue("outage")
+    database_down = True
+    applied = []
+    
+    async def apply(entries):
+        if database_down:
+            raise ConnectionError("database unavailable")
+        applied.extend(entries)
+        return len(entries)
+    
+    async def append_later(page_id: str, delay: float):
+        await asyncio.sleep(delay)
+        await outage_queue.append(page_id, {"completed_questions": 1})
+    
+    async def interleave():
+        nonlocal database_down
+        lost = []
+        outage_queue.start(apply)
+        try:
+            # A backlog from an outage makes each failed flush re-read a long journal
+            await asyncio.gather(*(outage_queue.append(f"backlog-{index}", {"completed_questions": 1})
+                                   for index in range(2000)))
+            for round_number in range(30):
+                # Staggered appends land before, during and after the flush re-reads the journal
+                page_ids = [f"page-{round_number}-{index}" for index in range(5)]
+                await asyncio.gather(outage_queue.flush(), *(append_later(page_id, index * 0.004)
+                                                             for index, page_id in enumerate(page_ids)),
+                                     return_exceptions=True)
+                lost.extend(page_id for page_id in page_ids if not outage_queue.has_pending(page_id))
+            database_down = False
+            await outage_queue.settle("page-29-4")
+        finally:
+            await outage_queue.stop()
+        return lost
+    
+    try:
+        asyncio.run(flush_in_order())
+        lost = asyncio.run(interleave())
+    finally:
+        shutil.rmtree(journal_dir, ignore_errors=True)
+    
+    sequence = [entry[0] for entry in written]
+    if [entry[2]['completed_questions'] for entry in written] != list(range(1, 8)) or sequence != sorted(set(sequence)):
+        print(f"❌ Write-behind flush out of order: {[entry[2] for entry in written]}")
+        return False
+    print(f"✅ {len(written)} journaled updates flushed once each, in order, across a partial failure")
+    if lost:
+        print(f"❌ Journaled updates missing from the overlay before their flush: {lost[:10]}")
+        return False
+    if outage_queue.has_pending("page-29-4") or len(applied) != 2150:
+        print(f"❌ Write-behind journal not flushed after recovery: {len(applied)} written")
+        return False
+    print(f"✅ Updates appended during flushes stay pending until written ({len(applied)} flushed)")
+    return True
+
 def main():
     """Main test function"""
     print("🚀 Starting IITian Academy Milestone Tracker Test")
@@ -170,7 +423,7 @@ def main():
     server_thread.start()
     
     # Run tests
-    success = test_endpoints()
+    success = test_endpoints() and test_backups() and test_idempotency() and test_write_behind()
     
     if success:
         print("\n" + "=" * 60)